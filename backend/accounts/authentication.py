@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# Everything permission checks and request logging read from request.user.
+# The password hash is deliberately never cached.
+CACHED_USER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'user_type',
+    'is_active', 'is_staff', 'is_superuser', 'is_email_verified')
+
+
+def auth_user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_cached_auth_user(user_id):
+    invalidate_cached_auth_users([user_id])
+
+
+def invalidate_cached_auth_users(user_ids):
+    # Again after commit, in case a request re-cached the pre-commit row in between
+    keys = [auth_user_cache_key(user_id) for user_id in user_ids]
+    caches['auth'].delete_many(keys)
+    transaction.on_commit(lambda: caches['auth'].delete_many(keys))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that rebuilds request.user from a short-lived cache entry
+    instead of querying the user table on every request.
+
+    The returned user only has CACHED_USER_FIELDS loaded; any other field is
+    loaded from the database the first time it is accessed, and save() only
+    writes the fields changed since (see User.save).
+    """
+
+    def get_user(self, validated_token):
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        cache_key = auth_user_cache_key(user_id)
+        values = caches['auth'].get(cache_key)
+        if values is None:
+            values = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}).values(*CACHED_USER_FIELDS).first()
+            if values is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            caches['auth'].set(cache_key, values, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+        if not values['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        # from_db() expects the loaded values in model field order
+        field_names = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in values]
+        user = self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            field_names,
+            [values[field_name] for field_name in field_names])
+        user._partially_loaded = True
+        user._cached_values = dict(values)
+        return user
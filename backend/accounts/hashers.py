@@ -0,0 +1,105 @@
+import base64
+import multiprocessing
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.encoding import force_bytes
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .hashing_worker import pbkdf2_hmac
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashingOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The server is busy verifying passwords. Please try again in a moment.'
+    default_code = 'password_hashing_overloaded'
+
+
+class PasswordHashingPool:
+    """
+    Bounded process pool for password hashing.
+
+    The calling thread still blocks on the result: the pool does not free
+    request threads, it moves the CPU work out of the server process so a
+    burst of logins cannot starve cheap requests (measure with
+    benchmark_login; PASSWORD_HASHING_WORKERS=0 hashes inline).
+
+    At most PASSWORD_HASHING_WORKERS hashes run at once and up to
+    PASSWORD_HASHING_MAX_QUEUE more may wait. Inside fail_fast() (the API login
+    view) a caller that cannot get a slot within PASSWORD_HASHING_QUEUE_TIMEOUT
+    seconds fails with a 503 instead of tying up its worker thread; other
+    callers (admin login, management commands) wait for a slot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._local = threading.local()
+
+    @contextmanager
+    def fail_fast(self):
+        previous = getattr(self._local, 'fail_fast', False)
+        self._local.fail_fast = True
+        try:
+            yield
+        finally:
+            self._local.fail_fast = previous
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                workers = settings.PASSWORD_HASHING_WORKERS
+                self._slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASHING_MAX_QUEUE)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context(settings.PASSWORD_HASHING_START_METHOD))
+                logger.info(f"Started password hashing pool with {workers} workers")
+            return self._executor, self._slots
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def run(self, fn, *args):
+        if settings.PASSWORD_HASHING_WORKERS <= 0:
+            return fn(*args)
+        executor, slots = self._get_executor()
+        if getattr(self._local, 'fail_fast', False):
+            if not slots.acquire(timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT):
+                logger.warning("Password hashing queue is full, rejecting request")
+                raise PasswordHashingOverloaded()
+        else:
+            slots.acquire()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            logger.error("Password hashing pool broke, restarting it and hashing inline")
+            self._reset(executor)
+            return fn(*args)
+        finally:
+            slots.release()
+
+
+hashing_pool = PasswordHashingPool()
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # Same algorithm name as Django's hasher, so existing hashes keep verifying
+    # (verify() re-encodes through encode(), i.e. through the pool).
+
+    def encode(self, password, salt, iterations=None):
+        self._check_encode_args(password, salt)
+        iterations = iterations or self.iterations
+        hash = hashing_pool.run(
+            pbkdf2_hmac, self.digest().name, force_bytes(password), force_bytes(salt), iterations)
+        hash = base64.b64encode(hash).decode("ascii").strip()
+        return "%s$%d$%s$%s" % (self.algorithm, iterations, salt, hash)
@@ -0,0 +1,7 @@
+# Kept free of Django imports: worker processes only need hashlib to unpickle
+# and run this function.
+import hashlib
+
+
+def pbkdf2_hmac(digest_name, password, salt, iterations):
+    return hashlib.pbkdf2_hmac(digest_name, password, salt, iterations)
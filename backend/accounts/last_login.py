@@ -0,0 +1,82 @@
+import atexit
+import threading
+from datetime import timedelta
+from time import monotonic
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginRecorder:
+    """
+    Debounced replacement for SIMPLE_JWT['UPDATE_LAST_LOGIN'].
+
+    A login only touches last_login when the stored value is older than
+    LAST_LOGIN_UPDATE_INTERVAL minutes, and those updates are buffered and
+    written together with a single bulk UPDATE, at the latest
+    LAST_LOGIN_FLUSH_INTERVAL seconds after the first one (a daemon timer, so
+    quiet workers flush too). Updates still buffered when the process is
+    killed without running atexit are lost.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._first_pending_at = None
+        self._timer = None
+
+    def record(self, user, when=None):
+        when = when or timezone.now()
+        threshold = timedelta(minutes=settings.LAST_LOGIN_UPDATE_INTERVAL)
+        if user.last_login and when - user.last_login < threshold:
+            return False
+        with self._lock:
+            self._pending[user.pk] = when
+            if self._first_pending_at is None:
+                self._first_pending_at = monotonic()
+                self._timer = threading.Timer(settings.LAST_LOGIN_FLUSH_INTERVAL, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+            should_flush = (
+                len(self._pending) >= settings.LAST_LOGIN_FLUSH_SIZE or
+                monotonic() - self._first_pending_at >= settings.LAST_LOGIN_FLUSH_INTERVAL)
+        if should_flush:
+            self.flush()
+        return True
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread got its own database connection
+            connection.close()
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._first_pending_at = None
+            timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if not pending:
+            return 0
+        User = get_user_model()
+        try:
+            User.objects.bulk_update(
+                [User(pk=pk, last_login=when) for pk, when in pending.items()],
+                ['last_login'],
+                batch_size=settings.LAST_LOGIN_FLUSH_SIZE)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(pending)} last_login updates: {str(e)}")
+            return 0
+        logger.info(f"Flushed {len(pending)} last_login updates")
+        return len(pending)
+
+
+last_login_recorder = LastLoginRecorder()
+atexit.register(last_login_recorder.flush)
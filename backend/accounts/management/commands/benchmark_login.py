@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from appointment_system.benchmarking import Scenario, http_request, run_mixed_load, format_report
+
+class Command(BaseCommand):
+    help = ('Measure login throughput and the latency of a cheap endpoint under mixed load '
+            'against a running server. Run it once with PASSWORD_HASHING_WORKERS=0 and once '
+            'with the process pool enabled to compare.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--username', required=True, help='Existing active user to log in as')
+        parser.add_argument('--password', required=True)
+        parser.add_argument(
+            '--read-path',
+            default='/api/businesses/categories/',
+            help='Cheap endpoint whose latency is measured alongside logins, e.g. an available-slots URL')
+        parser.add_argument('--login-concurrency', type=int, default=8)
+        parser.add_argument('--read-concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=30, help='Seconds')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        credentials = {'username': options['username'], 'password': options['password']}
+        scenarios = [
+            Scenario(
+                'login', options['login_concurrency'],
+                lambda: http_request(f"{base_url}/api/token/", data=credentials)),
+            Scenario(
+                'read', options['read_concurrency'],
+                lambda: http_request(f"{base_url}{options['read_path']}"))]
+        self.stdout.write(f"Running mixed load against {base_url} for {options['duration']:.0f}s...")
+        run_mixed_load(scenarios, options['duration'])
+        for line in format_report(scenarios, options['duration']):
+            self.stdout.write(line)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from accounts.utils import clear_expired_tokens
+
+class Command(BaseCommand):
+    help = 'Clear expired email verification and password reset tokens'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Clearing expired tokens...')
+        cleared = clear_expired_tokens()
+        self.stdout.write(self.style.SUCCESS(
+            f"Cleared {cleared['verification']} verification and {cleared['password_reset']} password reset tokens"))
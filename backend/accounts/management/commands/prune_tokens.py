@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from accounts.utils import prune_expired_jwt_tokens, TOKEN_PRUNE_BATCH_SIZE
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted JWT refresh tokens in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TOKEN_PRUNE_BATCH_SIZE,
+            help='Tokens deleted per transaction')
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Pruning expired tokens...')
+        result = prune_expired_jwt_tokens(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {result['outstanding']} outstanding and {result['blacklisted']} blacklisted tokens "
+            f"in {result['batches']} batches ({result['elapsed']:.2f}s)"))
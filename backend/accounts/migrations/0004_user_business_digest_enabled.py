@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_add_password_reset_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='business_digest_enabled',
+            field=models.BooleanField(default=False, help_text='Send business owners one daily digest instead of an email per booking/cancellation'),
+        ),
+    ]
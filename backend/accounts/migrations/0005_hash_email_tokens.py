@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:51
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    for field_name in ('email_verification_token', 'password_reset_token'):
+        pending = User.objects.filter(**{f'{field_name}__isnull': False}).values_list('pk', field_name)
+        for pk, token in list(pending):
+            digest = hashlib.sha256(token.encode('utf-8')).hexdigest()
+            User.objects.filter(pk=pk).update(**{field_name: digest})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_business_digest_enabled'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email_verification_token',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='password_reset_token',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+    ]
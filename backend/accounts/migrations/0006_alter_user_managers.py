@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:21
+
+import accounts.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_hash_email_tokens'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', accounts.models.AccountUserManager()),
+            ],
+        ),
+    ]
@@ -1,13 +1,43 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.utils import timezone
 from django.conf import settings
 import uuid
 import secrets
+import hashlib
 from datetime import timedelta
 from django.contrib.auth.hashers import check_password
 
 
+def hash_token(token):
+    # Only a SHA-256 digest of emailed tokens is stored, so lookups hit the index
+    # and a database leak does not expose usable verification/reset links.
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class UserQuerySet(models.QuerySet):
+    # Bulk writes send no post_save, so they drop cached JWT users themselves
+    def update(self, **kwargs):
+        from .authentication import CACHED_USER_FIELDS, invalidate_cached_auth_users
+        if not set(kwargs) & set(CACHED_USER_FIELDS):
+            return super().update(**kwargs)
+        user_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        invalidate_cached_auth_users(user_ids)
+        return updated
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        from .authentication import CACHED_USER_FIELDS, invalidate_cached_auth_users
+        updated = super().bulk_update(objs, fields, batch_size=batch_size)
+        if set(fields) & set(CACHED_USER_FIELDS):
+            invalidate_cached_auth_users([obj.pk for obj in objs])
+        return updated
+
+
+class AccountUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     USER_TYPE_CHOICES = (
         ('admin', 'Administrator'),
@@ -20,22 +50,56 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_email_verified = models.BooleanField(default=False)
-    email_verification_token = models.CharField(max_length=64, blank=True, null=True)
+    email_verification_token = models.CharField(max_length=64, blank=True, null=True, db_index=True)
     email_verification_sent_at = models.DateTimeField(blank=True, null=True)
-    password_reset_token = models.CharField(max_length=64, blank=True, null=True)
+    password_reset_token = models.CharField(max_length=64, blank=True, null=True, db_index=True)
     password_reset_sent_at = models.DateTimeField(blank=True, null=True)
     last_password_hash = models.CharField(max_length=128, blank=True, null=True)
+    business_digest_enabled = models.BooleanField(
+        default=False,
+        help_text="Send business owners one daily digest instead of an email per booking/cancellation")
+
+    objects = AccountUserManager()
     
 
     def __str__(self):
         return self.username
     
 
+    def save(self, *args, **kwargs):
+        # Users rebuilt by CachedJWTAuthentication hold values up to AUTH_USER_CACHE_TIMEOUT
+        # old: write only what changed since (plus updated_at), never the cached values back
+        cached_values = getattr(self, '_cached_values', None)
+        if cached_values is not None and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname in self.__dict__ and (
+                    field.attname not in cached_values or getattr(self, field.attname) != cached_values[field.attname])
+            ] + ['updated_at']
+        super().save(*args, **kwargs)
+        if cached_values is not None:
+            self._cached_values = {
+                field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+                if field.attname in self.__dict__}
+
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Users resolved by CachedJWTAuthentication only carry a few fields;
+        # load all the missing ones together the first time any is touched.
+        if fields is not None and getattr(self, '_partially_loaded', False):
+            deferred_fields = self.get_deferred_fields()
+            if set(fields) <= deferred_fields:
+                fields = list(deferred_fields)
+                self._partially_loaded = False
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+    
+
     def generate_verification_token(self):
-        self.email_verification_token = secrets.token_urlsafe(32)
+        token = secrets.token_urlsafe(32)
+        self.email_verification_token = hash_token(token)
         self.email_verification_sent_at = timezone.now()
         self.save(update_fields=['email_verification_token', 'email_verification_sent_at'])
-        return self.email_verification_token
+        return token
     
 
     def is_verification_token_valid(self):
@@ -52,10 +116,11 @@ class User(AbstractUser):
 
 
     def generate_password_reset_token(self):
-        self.password_reset_token = secrets.token_urlsafe(32)
+        token = secrets.token_urlsafe(32)
+        self.password_reset_token = hash_token(token)
         self.password_reset_sent_at = timezone.now()
         self.save(update_fields=['password_reset_token', 'password_reset_sent_at'])
-        return self.password_reset_token
+        return token
     
 
     def is_password_reset_token_valid(self):
@@ -2,7 +2,10 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.hashers import check_password
-from .validators import validate_password_strength
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .validators import validate_password_strength, evaluate_password_policy
+from .models import hash_token
+from .last_login import last_login_recorder
 import logging
 
 logger = logging.getLogger(__name__)
@@ -103,7 +106,7 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
             raise serializers.ValidationError({"confirm_password": "Passwords do not match."})
         try:
             user = User.objects.get(
-                password_reset_token=token,
+                password_reset_token=hash_token(token),
                 password_reset_sent_at__isnull=False)
             if not user.is_password_reset_token_valid():
                 raise serializers.ValidationError({
@@ -112,12 +115,9 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         except User.DoesNotExist:
             raise serializers.ValidationError({
                 "token": "Invalid password reset link. Please request a new one."})
-        validation_result = validate_password_strength(new_password, user.username)
+        validation_result = evaluate_password_policy(new_password, user=user)
         if not validation_result['is_valid']:
             raise serializers.ValidationError({"new_password": validation_result['errors']})
-        if user.is_password_reused(new_password):
-            raise serializers.ValidationError({
-                "new_password": "You cannot reuse your previous password. Please choose a different password."})
         return attrs
 
 
@@ -144,12 +144,9 @@ class ChangePasswordSerializer(serializers.Serializer):
         if current_password == new_password:
             raise serializers.ValidationError({
                 "new_password": "New password cannot be the same as your current password."})
-        validation_result = validate_password_strength(new_password, user.username)
+        validation_result = evaluate_password_policy(new_password, user=user)
         if not validation_result['is_valid']:
             raise serializers.ValidationError({"new_password": validation_result['errors']})
-        if user.is_password_reused(new_password):
-            raise serializers.ValidationError({
-                "new_password": "You cannot reuse your previous password. Please choose a different password."})
         return attrs
 
 
@@ -208,8 +205,23 @@ class UserProfileSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Failed to update profile. Please try again.")
 
 
+class OwnProfileSerializer(UserProfileSerializer):
+    # Private settings only the user sees on their own profile (UserProfileSerializer is
+    # also nested in public business payloads)
+    class Meta(UserProfileSerializer.Meta):
+        fields = UserProfileSerializer.Meta.fields + ['business_digest_enabled']
+
+
 class EmailVerificationSerializer(serializers.Serializer):
     token = serializers.CharField(max_length=64)
 
 class ResendVerificationSerializer(serializers.Serializer):
-    email = serializers.EmailField()
\ No newline at end of file
+    email = serializers.EmailField()
+
+
+class LoginSerializer(TokenObtainPairSerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        last_login_recorder.record(self.user)
+        return data
+
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from appointment_system.cache import analytics_cache
+from .authentication import invalidate_cached_auth_user
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def clear_cached_auth_user(sender, instance, **kwargs):
+    invalidate_cached_auth_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_analytics(sender, instance, created=False, **kwargs):
+    # The admin analytics summary counts users by type
+    if created or kwargs['signal'] is post_delete:
+        analytics_cache.invalidate_on_commit()
@@ -0,0 +1,60 @@
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+from time import monotonic, sleep
+import logging
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+TOKEN_PRUNE_BATCH_SIZE = 1000
+
+
+def clear_expired_tokens():
+    now = timezone.now()
+    verification_cutoff = now - timedelta(hours=getattr(settings, 'EMAIL_VERIFICATION_TIMEOUT', 24))
+    reset_cutoff = now - timedelta(hours=getattr(settings, 'PASSWORD_RESET_TIMEOUT', 1))
+    verification_cleared = User.objects.filter(
+        email_verification_token__isnull=False,
+        email_verification_sent_at__lt=verification_cutoff).update(email_verification_token=None)
+    reset_cleared = User.objects.filter(
+        password_reset_token__isnull=False,
+        password_reset_sent_at__lt=reset_cutoff).update(password_reset_token=None)
+    logger.info(f"Cleared {verification_cleared} expired verification tokens and {reset_cleared} expired reset tokens")
+    return {
+        'verification': verification_cleared,
+        'password_reset': reset_cleared}
+
+
+def prune_expired_jwt_tokens(batch_size=TOKEN_PRUNE_BATCH_SIZE, pause=0.0):
+    started = monotonic()
+    removed = {'outstanding': 0, 'blacklisted': 0, 'batches': 0}
+    if not apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+        logger.warning("Token blacklist app is not installed, nothing to prune")
+        return dict(removed, elapsed=0.0)
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    now = timezone.now()
+    # Small primary-key batches, each in its own short transaction, so the
+    # refresh endpoint never waits behind one long DELETE.
+    while True:
+        token_ids = list(OutstandingToken.objects.filter(
+            expires_at__lte=now).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not token_ids:
+            break
+        with transaction.atomic():
+            removed['blacklisted'] += BlacklistedToken.objects.filter(token_id__in=token_ids).delete()[0]
+            removed['outstanding'] += OutstandingToken.objects.filter(id__in=token_ids).delete()[0]
+        removed['batches'] += 1
+        if len(token_ids) < batch_size:
+            break
+        if pause:
+            sleep(pause)
+    elapsed = monotonic() - started
+    logger.info(
+        f"Pruned {removed['outstanding']} outstanding and {removed['blacklisted']} blacklisted tokens "
+        f"in {removed['batches']} batches ({elapsed:.2f}s)")
+    return dict(removed, elapsed=elapsed)
+
@@ -2,25 +2,72 @@ import re
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 
+SPECIAL_CHARACTERS_PATTERN = r'[!@#$%^&*(),.?":{}|<>]'
+PASSWORD_REUSED_MESSAGE = "You cannot reuse your previous password. Please choose a different password."
+
+
+def evaluate_password_policy(password, user=None, username=None, check_reuse=True):
+    # Every rule is evaluated once per (password, user). The result is memoized on
+    # the user instance, so serializers and the AUTH_PASSWORD_VALIDATORS running in
+    # the same request share one PBKDF2 comparison against last_password_hash.
+    if user is not None and username is None:
+        username = getattr(user, 'username', '') or ''
+    memo = None
+    memo_key = (password, username, check_reuse)
+    if user is not None:
+        memo = user.__dict__.setdefault('_password_policy_memo', {})
+        if memo_key in memo:
+            return memo[memo_key]
+    result = {
+        'is_valid': True,
+        'errors': [],
+        'strength_score': 0,
+        'requirements': {
+            'min_length': len(password) >= 8,
+            'has_uppercase': bool(re.search(r'[A-Z]', password)),
+            'has_special': bool(re.search(SPECIAL_CHARACTERS_PATTERN, password)),
+            'not_similar_to_username': not (username and username.lower() in password.lower())}}
+    requirement_errors = (
+        ('min_length', "Password must contain at least 8 characters."),
+        ('has_uppercase', "Password must contain at least one uppercase letter."),
+        ('has_special', "Password must contain at least one special character."),
+        ('not_similar_to_username', "Password cannot contain your username."))
+    for requirement, message in requirement_errors:
+        if result['requirements'][requirement]:
+            result['strength_score'] += 25
+        else:
+            result['errors'].append(message)
+            result['is_valid'] = False
+    # The reuse check costs a full password hash, so it only runs for passwords
+    # that pass every cheap rule.
+    if check_reuse and result['is_valid'] and user is not None and hasattr(user, 'is_password_reused'):
+        result['requirements']['not_reused'] = not user.is_password_reused(password)
+        if not result['requirements']['not_reused']:
+            result['errors'].append(PASSWORD_REUSED_MESSAGE)
+            result['is_valid'] = False
+    if memo is not None:
+        memo[memo_key] = result
+    return result
+
+
 
 class CustomPasswordValidator: 
     def validate(self, password, user=None):
         errors = []
-        if len(password) < 8:
+        requirements = evaluate_password_policy(password, user=user)['requirements']
+        if not requirements['min_length']:
             errors.append(_("Password must contain at least 8 characters."))
-        if not re.search(r'[A-Z]', password):
+        if not requirements['has_uppercase']:
             errors.append(_("Password must contain at least one uppercase letter."))
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if not requirements['has_special']:
             errors.append(
                 _("Password must contain at least one special character (!@#$%^&*(),.?\":{}|<>)."))
         if user:
-            username = user.username.lower() if hasattr(user, 'username') else ''
-            if username and username in password.lower():
+            if not requirements['not_similar_to_username']:
                 errors.append(
                     _("Password cannot contain your username. Please choose a different password."))
-            if hasattr(user, 'is_password_reused') and user.is_password_reused(password):
-                errors.append(
-                    _("You cannot reuse your previous password. Please choose a different password."))
+            if not requirements.get('not_reused', True):
+                errors.append(_(PASSWORD_REUSED_MESSAGE))
         if errors:
             raise ValidationError(errors)
     
@@ -34,9 +81,9 @@ class CustomPasswordValidator:
 class PasswordReuseValidator:
     def validate(self, password, user=None):
         if user and hasattr(user, 'is_password_reused'):
-            if user.is_password_reused(password):
+            if not evaluate_password_policy(password, user=user)['requirements'].get('not_reused', True):
                 raise ValidationError(
-                    _("You cannot reuse your previous password. Please choose a different password."),
+                    _(PASSWORD_REUSED_MESSAGE),
                     code='password_reused')
     
 
@@ -51,7 +98,7 @@ class UsernamePasswordSimilarityValidator:
         username = getattr(user, 'username', '')
         if not username:
             return
-        if username.lower() in password.lower():
+        if not evaluate_password_policy(password, user=user)['requirements']['not_similar_to_username']:
             raise ValidationError(
                 _("Password cannot contain your username. Please choose a different password."),
                 code='password_too_similar')
@@ -62,34 +109,4 @@ class UsernamePasswordSimilarityValidator:
 
 
 def validate_password_strength(password, username=None):
-    result = {
-        'is_valid': True,
-        'errors': [],
-        'strength_score': 0,
-        'requirements': {
-            'min_length': len(password) >= 8,
-            'has_uppercase': bool(re.search(r'[A-Z]', password)),
-            'has_special': bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', password)),
-            'not_similar_to_username': True}}
-    if not result['requirements']['min_length']:
-        result['errors'].append("Password must contain at least 8 characters.")
-        result['is_valid'] = False
-    else:
-        result['strength_score'] += 25
-    if not result['requirements']['has_uppercase']:
-        result['errors'].append("Password must contain at least one uppercase letter.")
-        result['is_valid'] = False
-    else:
-        result['strength_score'] += 25
-    if not result['requirements']['has_special']:
-        result['errors'].append("Password must contain at least one special character.")
-        result['is_valid'] = False
-    else:
-        result['strength_score'] += 25
-    if username and username.lower() in password.lower():
-        result['requirements']['not_similar_to_username'] = False
-        result['errors'].append("Password cannot contain your username.")
-        result['is_valid'] = False
-    else:
-        result['strength_score'] += 25
-    return result
\ No newline at end of file
+    return evaluate_password_policy(password, username=username, check_reuse=False)
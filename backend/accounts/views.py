@@ -2,25 +2,40 @@ from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from appointment_system.throttling import TokenBucketThrottle
+from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model, authenticate
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from .serializers import (
-    UserSerializer, UserProfileSerializer, EmailVerificationSerializer, 
+    UserSerializer, UserProfileSerializer, OwnProfileSerializer, EmailVerificationSerializer, 
     ResendVerificationSerializer, PasswordResetRequestSerializer,
-    PasswordResetConfirmSerializer, ChangePasswordSerializer)
+    PasswordResetConfirmSerializer, ChangePasswordSerializer, LoginSerializer)
 from .email_utils import (
     send_verification_email, send_verification_success_email,
     send_password_reset_email)
 from .validators import validate_password_strength
+from .models import hash_token
+from .hashers import hashing_pool
 import logging
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+class LoginView(TokenObtainPairView):
+    serializer_class = LoginSerializer
+
+    def post(self, request, *args, **kwargs):
+        # Only this view turns a full hashing queue into a 503 (PasswordHashingOverloaded)
+        with hashing_pool.fail_fast():
+            return super().post(request, *args, **kwargs)
+
+
 class PasswordResetRequestView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'password_reset'
     def post(self, request):
         serializer = PasswordResetRequestSerializer(data=request.data)
         if not serializer.is_valid():
@@ -103,6 +118,8 @@ def change_password(request):
 
 class PasswordStrengthView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'password_strength'
     def post(self, request):
         password = request.data.get('password', '')
         username = request.data.get('username', '')
@@ -164,7 +181,7 @@ class EmailVerificationView(APIView):
         token = serializer.validated_data['token']
         try:
             user = User.objects.get(
-                email_verification_token=token,
+                email_verification_token=hash_token(token),
                 is_email_verified=False)
             if not user.is_verification_token_valid():
                 logger.warning(f"Expired verification token used for user: {user.email}")
@@ -203,6 +220,8 @@ class EmailVerificationView(APIView):
 
 class ResendVerificationEmailView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'resend_verification'
     def post(self, request):
         serializer = ResendVerificationSerializer(data=request.data)
         if not serializer.is_valid():
@@ -244,6 +263,8 @@ class ResendVerificationEmailView(APIView):
 
 class CheckVerificationStatusView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'verification_status'
     def post(self, request):
         email = request.data.get('email')
         if not email:
@@ -264,7 +285,7 @@ class CheckVerificationStatusView(APIView):
 
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
-    serializer_class = UserProfileSerializer
+    serializer_class = OwnProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'appointment_system.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'appointment_system.asgi_urls')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup so the apps registry is ready
+from appointments.sse import route_slot_events  # noqa: E402
+
+application = route_slot_events(django_application)
@@ -0,0 +1,14 @@
+from django.urls import path
+from appointments.async_views import available_slots
+from businesses.async_views import business_detail, business_list
+from .urls import urlpatterns as sync_urlpatterns
+
+# URLconf of the ASGI entrypoint: async fast paths for the hot read endpoints,
+# then every regular route (which the fast paths also fall back to). Under ASGI each
+# sync middleware hook still costs a thread hop per request, which these views cannot
+# skip; compare with benchmark_endpoints before moving read traffic off the WSGI workers.
+urlpatterns = [
+    path('api/appointments/available-slots/', available_slots),
+    path('api/businesses/', business_list),
+    path('api/businesses/<int:pk>/', business_detail),
+    *sync_urlpatterns]
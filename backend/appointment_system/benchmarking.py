@@ -0,0 +1,76 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from time import monotonic
+
+
+def http_request(url, data=None, headers=None, timeout=30):
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    request_headers = {'Content-Type': 'application/json'} if body is not None else {}
+    request_headers.update(headers or {})
+    request = urllib.request.Request(url, data=body, headers=request_headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Scenario:
+    def __init__(self, name, concurrency, send):
+        self.name = name
+        self.concurrency = concurrency
+        self.send = send
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+
+
+def run_mixed_load(scenarios, duration):
+    """Run every scenario's send() in its own threads for `duration` seconds."""
+    deadline = monotonic() + duration
+
+    def worker(scenario):
+        while monotonic() < deadline:
+            started = monotonic()
+            try:
+                ok = scenario.send() < 400
+            except Exception:
+                ok = False
+            scenario.record(monotonic() - started, ok)
+
+    threads = [
+        threading.Thread(target=worker, args=(scenario,), daemon=True)
+        for scenario in scenarios for _ in range(scenario.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return scenarios
+
+
+def format_report(scenarios, duration):
+    lines = [f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"]
+    for scenario in scenarios:
+        lines.append(
+            f"{scenario.name:<20}{len(scenario.latencies):>10}{scenario.errors:>8}"
+            f"{len(scenario.latencies) / duration:>10.1f}"
+            f"{percentile(scenario.latencies, 50) * 1000:>10.1f}"
+            f"{percentile(scenario.latencies, 99) * 1000:>10.1f}")
+    return lines
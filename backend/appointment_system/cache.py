@@ -0,0 +1,452 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.core.cache.backends.dummy import DummyCache
+from django.db import transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for "not cached", since None is a legitimate cached value
+MISSING = object()
+STATS_COUNTERS = ('local_hits', 'shared_hits', 'misses', 'builds', 'waits')
+namespaces = {}
+
+
+class LocalLRU:
+    """Bounded, thread-safe per-process cache with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def new_version_seed():
+    # Version keys can be culled or evicted; re-seeding with a value that was never
+    # used before keeps entries stored under the lost version unreachable
+    return time.time_ns()
+
+
+def incr_persistent(key, delta=1):
+    # BaseCache.incr (file and database backends) re-sets the key with the default
+    # timeout; version and stats keys must never expire
+    value = shared_cache.incr(key, delta)
+    shared_cache.touch(key, None)
+    return value
+
+
+local_cache = LocalLRU(getattr(settings, 'LOCAL_CACHE_MAX_ENTRIES', 5000))
+
+
+class CacheNamespace:
+    """
+    A named group of keys served from the process-local LRU first, then the
+    shared cache (CACHES['default']), then the builder. With
+    CACHE_SHARE_VALUES off (no Redis), values are only kept in the local LRU
+    and the shared cache holds nothing but versions and stats.
+
+    Keys embed a namespace version and an optional per-scope version (e.g. a
+    business id), so invalidate() drops a whole namespace or scope with one
+    increment. Versions are re-read from the shared cache at most every
+    CACHE_VERSION_CHECK_INTERVAL seconds, which bounds how long another
+    process can keep serving an invalidated local entry. get_or_set() lets a
+    single caller per key rebuild a missing value (a thread lock within the
+    process, a cache.add() lock across processes) while the others wait.
+    """
+
+    def __init__(self, name, timeout, local_timeout=None):
+        self.name = name
+        self.timeout = timeout
+        self.share_values = getattr(settings, 'CACHE_SHARE_VALUES', True)
+        # Without a shared tier, versions alone keep local entries from outliving an invalidation
+        self.local_timeout = (local_timeout or min(timeout, 30)) if self.share_values else timeout
+        self.values_cache = shared_cache if self.share_values else DummyCache(f'{name}-local-only', {})
+        self.versions = {}
+        self.versions_lock = threading.Lock()
+        self.build_locks = defaultdict(threading.Lock)
+        self.build_locks_lock = threading.Lock()
+        self.counts = dict.fromkeys(STATS_COUNTERS, 0)
+        self.unflushed = 0
+        self.stats_lock = threading.Lock()
+        namespaces[name] = self
+
+    # Versions
+
+    def version_key(self, scope=None):
+        return f"cachens:{self.name}:version" if scope is None else f"cachens:{self.name}:{scope}:version"
+
+    def version(self, scope=None):
+        version_key = self.version_key(scope)
+        now = time.monotonic()
+        cached = self.versions.get(version_key)
+        if cached and cached[1] > now:
+            return cached[0]
+        version = shared_cache.get(version_key)
+        if version is None:
+            seed = new_version_seed()
+            shared_cache.add(version_key, seed, None)
+            version = shared_cache.get(version_key, seed)
+        interval = getattr(settings, 'CACHE_VERSION_CHECK_INTERVAL', 2)
+        with self.versions_lock:
+            self.versions[version_key] = (version, now + interval)
+        return version
+
+    def invalidate(self, scope=None):
+        version_key = self.version_key(scope)
+        try:
+            version = incr_persistent(version_key)
+        except ValueError:
+            version = new_version_seed()
+            shared_cache.set(version_key, version, None)
+        with self.versions_lock:
+            self.versions[version_key] = (version, time.monotonic() + getattr(settings, 'CACHE_VERSION_CHECK_INTERVAL', 2))
+        return version
+
+    def invalidate_on_commit(self, scope=None):
+        # Bumping before commit would let a reader cache pre-commit rows under the new version
+        transaction.on_commit(lambda: self.invalidate(scope))
+
+    def invalidate_scopes_on_commit(self, scopes):
+        scopes = list(scopes)
+        if scopes:
+            transaction.on_commit(lambda: [self.invalidate(scope) for scope in scopes])
+
+    def versions_to_fetch(self, scopes):
+        # Splits scopes into memoized versions and the version keys due for a shared read
+        now = time.monotonic()
+        versions = {}
+        due = {}
+        for scope in scopes:
+            version_key = self.version_key(scope)
+            cached = self.versions.get(version_key)
+            if cached and cached[1] > now:
+                versions[scope] = cached[0]
+            else:
+                due[version_key] = scope
+        return versions, due
+
+    def remember_versions(self, versions_by_key):
+        expires_at = time.monotonic() + getattr(settings, 'CACHE_VERSION_CHECK_INTERVAL', 2)
+        with self.versions_lock:
+            for version_key, version in versions_by_key.items():
+                self.versions[version_key] = (version, expires_at)
+
+    def scope_versions(self, scopes):
+        # Like version(scope) for many scopes, with one shared read for those not checked recently
+        versions, due = self.versions_to_fetch(scopes)
+        if due:
+            fetched = shared_cache.get_many(list(due))
+            for version_key in due:
+                if version_key not in fetched:
+                    seed = new_version_seed()
+                    shared_cache.add(version_key, seed, None)
+                    fetched[version_key] = shared_cache.get(version_key, seed)
+            self.remember_versions({version_key: fetched[version_key] for version_key in due})
+            versions.update({scope: fetched[version_key] for version_key, scope in due.items()})
+        return versions
+
+    def current_scoped_versions(self, scopes):
+        # current_versions() for get_scoped_many()/set_scoped_many()
+        return self.version(), self.scope_versions(scopes)
+
+    def scoped_keys(self, suffix, scopes, versions):
+        namespace_version, scope_versions = versions
+        return {
+            self.make_key(suffix, scope, (namespace_version, scope_versions[scope])): scope
+            for scope in scopes}
+
+    def make_key(self, suffix, scope=None, versions=None):
+        namespace_version, scope_version = versions or self.current_versions(scope)
+        if scope is None:
+            return f"{self.name}:v{namespace_version}:{suffix}"
+        return f"{self.name}:v{namespace_version}:{scope}:v{scope_version}:{suffix}"
+
+    def current_versions(self, scope=None):
+        # Capture before reading the source data and pass to set()/set_many(), so a
+        # value read just before an invalidation is stored under the old version
+        return self.version(), self.version(scope) if scope is not None else None
+
+    # Reads and writes
+
+    def get(self, suffix, scope=None, versions=None, record=True):
+        key = self.make_key(suffix, scope, versions)
+        value = local_cache.get(key)
+        if value is not MISSING:
+            record and self.record('local_hits')
+            return value
+        value = self.values_cache.get(key, MISSING)
+        if value is not MISSING:
+            record and self.record('shared_hits')
+            local_cache.set(key, value, self.local_timeout)
+            return value
+        record and self.record('misses')
+        return MISSING
+
+    def get_many(self, suffixes, scope=None, versions=None):
+        versions = versions or self.current_versions(scope)
+        return self.read_many({self.make_key(suffix, scope, versions): suffix for suffix in suffixes})
+
+    def get_scoped_many(self, suffix, scopes, versions=None):
+        # {scope: value} for one suffix under many scopes, each with its own version
+        versions = versions or self.current_scoped_versions(scopes)
+        return self.read_many(self.scoped_keys(suffix, scopes, versions))
+
+    def read_many(self, keys):
+        # keys maps cache keys to the names the caller wants the values under
+        found = {}
+        remote = []
+        for key, suffix in keys.items():
+            value = local_cache.get(key)
+            if value is MISSING:
+                remote.append(key)
+            else:
+                found[suffix] = value
+        self.record('local_hits', len(found))
+        if remote:
+            fetched = self.values_cache.get_many(remote)
+            for key, value in fetched.items():
+                local_cache.set(key, value, self.local_timeout)
+                found[keys[key]] = value
+            self.record('shared_hits', len(fetched))
+            self.record('misses', len(remote) - len(fetched))
+        return found
+
+    def set(self, suffix, value, scope=None, versions=None, timeout=None):
+        key = self.make_key(suffix, scope, versions)
+        self.values_cache.set(key, value, timeout or self.timeout)
+        local_cache.set(key, value, min(self.local_timeout, timeout or self.timeout))
+
+    def set_many(self, values, scope=None, versions=None, timeout=None):
+        versions = versions or self.current_versions(scope)
+        self.write_many({self.make_key(suffix, scope, versions): value for suffix, value in values.items()}, timeout)
+
+    def set_scoped_many(self, suffix, values, versions=None, timeout=None):
+        versions = versions or self.current_scoped_versions(values)
+        keys = self.scoped_keys(suffix, values, versions)
+        self.write_many({key: values[scope] for key, scope in keys.items()}, timeout)
+
+    def write_many(self, keyed, timeout=None):
+        self.values_cache.set_many(keyed, timeout or self.timeout)
+        for key, value in keyed.items():
+            local_cache.set(key, value, min(self.local_timeout, timeout or self.timeout))
+
+    def delete(self, suffix, scope=None):
+        key = self.make_key(suffix, scope)
+        self.values_cache.delete(key)
+        local_cache.delete(key)
+
+    def get_or_set(self, suffix, builder, scope=None, timeout=None, record=True):
+        versions = self.current_versions(scope)
+        value = self.get(suffix, scope, versions, record=record)
+        if value is not MISSING:
+            return value
+        key = self.make_key(suffix, scope, versions)
+        with self.build_lock(key):
+            # Another thread of this process may have built it while we waited
+            value = local_cache.get(key)
+            if value is not MISSING:
+                self.record('waits')
+                return value
+            lock_key = f"cachelock:{key}"
+            lock_timeout = getattr(settings, 'CACHE_BUILD_LOCK_TIMEOUT', 10)
+            if not self.values_cache.add(lock_key, 1, lock_timeout):
+                value = self.wait_for(key, lock_timeout)
+                if value is not MISSING:
+                    self.record('waits')
+                    local_cache.set(key, value, self.local_timeout)
+                    return value
+            try:
+                value = builder()
+                self.record('builds')
+                self.set(suffix, value, scope, versions, timeout)
+            finally:
+                self.values_cache.delete(lock_key)
+        return value
+
+    def build_lock(self, key):
+        with self.build_locks_lock:
+            lock = self.build_locks[key]
+            if len(self.build_locks) > 10000:
+                # Drop idle locks so the dict does not grow with every key ever built
+                for idle_key in [k for k, l in self.build_locks.items() if not l.locked() and k != key]:
+                    del self.build_locks[idle_key]
+            return lock
+
+    def wait_for(self, key, lock_timeout):
+        # Another process holds the build lock: poll the shared cache until it publishes
+        deadline = time.monotonic() + lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            value = self.values_cache.get(key, MISSING)
+            if value is not MISSING:
+                return value
+            if self.values_cache.get(f"cachelock:{key}") is None:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        return MISSING
+
+    # Async counterparts for the ASGI views; the local tier is shared with the sync methods
+
+    async def aversion(self, scope=None):
+        version_key = self.version_key(scope)
+        now = time.monotonic()
+        cached = self.versions.get(version_key)
+        if cached and cached[1] > now:
+            return cached[0]
+        version = await shared_cache.aget(version_key)
+        if version is None:
+            seed = new_version_seed()
+            await shared_cache.aadd(version_key, seed, None)
+            version = await shared_cache.aget(version_key, seed)
+        with self.versions_lock:
+            self.versions[version_key] = (version, now + getattr(settings, 'CACHE_VERSION_CHECK_INTERVAL', 2))
+        return version
+
+    async def acurrent_versions(self, scope=None):
+        return await self.aversion(), await self.aversion(scope) if scope is not None else None
+
+    async def ascope_versions(self, scopes):
+        versions, due = self.versions_to_fetch(scopes)
+        if due:
+            fetched = await shared_cache.aget_many(list(due))
+            for version_key in due:
+                if version_key not in fetched:
+                    seed = new_version_seed()
+                    await shared_cache.aadd(version_key, seed, None)
+                    fetched[version_key] = await shared_cache.aget(version_key, seed)
+            self.remember_versions({version_key: fetched[version_key] for version_key in due})
+            versions.update({scope: fetched[version_key] for version_key, scope in due.items()})
+        return versions
+
+    async def acurrent_scoped_versions(self, scopes):
+        return await self.aversion(), await self.ascope_versions(scopes)
+
+    async def aget_many(self, suffixes, scope=None, versions=None):
+        versions = versions or await self.acurrent_versions(scope)
+        return await self.aread_many({self.make_key(suffix, scope, versions): suffix for suffix in suffixes})
+
+    async def aget_scoped_many(self, suffix, scopes, versions=None):
+        versions = versions or await self.acurrent_scoped_versions(scopes)
+        return await self.aread_many(self.scoped_keys(suffix, scopes, versions))
+
+    async def aread_many(self, keys):
+        found = {}
+        remote = []
+        for key, suffix in keys.items():
+            value = local_cache.get(key)
+            if value is MISSING:
+                remote.append(key)
+            else:
+                found[suffix] = value
+        self.record('local_hits', len(found))
+        if remote:
+            fetched = await self.values_cache.aget_many(remote)
+            for key, value in fetched.items():
+                local_cache.set(key, value, self.local_timeout)
+                found[keys[key]] = value
+            self.record('shared_hits', len(fetched))
+            self.record('misses', len(remote) - len(fetched))
+        return found
+
+    async def aset_many(self, values, scope=None, versions=None, timeout=None):
+        versions = versions or await self.acurrent_versions(scope)
+        await self.awrite_many({self.make_key(suffix, scope, versions): value for suffix, value in values.items()}, timeout)
+
+    async def aset_scoped_many(self, suffix, values, versions=None, timeout=None):
+        versions = versions or await self.acurrent_scoped_versions(values)
+        keys = self.scoped_keys(suffix, values, versions)
+        await self.awrite_many({key: values[scope] for key, scope in keys.items()}, timeout)
+
+    async def awrite_many(self, keyed, timeout=None):
+        await self.values_cache.aset_many(keyed, timeout or self.timeout)
+        for key, value in keyed.items():
+            local_cache.set(key, value, min(self.local_timeout, timeout or self.timeout))
+
+    # Statistics
+
+    def record(self, counter, amount=1):
+        if not amount:
+            return
+        with self.stats_lock:
+            self.counts[counter] += amount
+            self.unflushed += amount
+            should_flush = self.unflushed >= getattr(settings, 'CACHE_STATS_FLUSH_EVERY', 100)
+        if should_flush:
+            self.flush_stats()
+
+    def flush_stats(self):
+        # Counters are summed across processes in the shared cache, in batches
+        with self.stats_lock:
+            pending = {counter: value for counter, value in self.counts.items() if value}
+            self.counts = dict.fromkeys(STATS_COUNTERS, 0)
+            self.unflushed = 0
+        for counter, value in pending.items():
+            stats_key = f"cachestats:{self.name}:{counter}"
+            try:
+                incr_persistent(stats_key, value)
+            except ValueError:
+                if not shared_cache.add(stats_key, value, None):
+                    incr_persistent(stats_key, value)
+
+    def stats(self):
+        self.flush_stats()
+        values = shared_cache.get_many([f"cachestats:{self.name}:{counter}" for counter in STATS_COUNTERS])
+        counts = {counter: values.get(f"cachestats:{self.name}:{counter}", 0) for counter in STATS_COUNTERS}
+        lookups = counts['local_hits'] + counts['shared_hits'] + counts['misses']
+        hits = counts['local_hits'] + counts['shared_hits']
+        return {
+            'namespace': self.name,
+            **counts,
+            'lookups': lookups,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'local_hit_ratio': round(counts['local_hits'] / lookups, 4) if lookups else None,
+            'version': self.version()}
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.counts = dict.fromkeys(STATS_COUNTERS, 0)
+            self.unflushed = 0
+        shared_cache.delete_many([f"cachestats:{self.name}:{counter}" for counter in STATS_COUNTERS])
+
+
+
+def all_cache_stats():
+    return [namespace.stats() for name, namespace in sorted(namespaces.items())]
+
+
+categories_cache = CacheNamespace('categories', timeout=600)
+listings_cache = CacheNamespace('listings', timeout=getattr(settings, 'BUSINESS_LISTINGS_CACHE_TIMEOUT', 300))
+snapshots_cache = CacheNamespace('snapshots', timeout=3600)
+availability_cache = CacheNamespace('availability', timeout=60, local_timeout=5)
+analytics_cache = CacheNamespace('analytics', timeout=300)
@@ -0,0 +1,95 @@
+import hashlib
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.exceptions import APIException
+
+
+class NotModified(APIException):
+    status_code = 304
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def conditional_validators(full_path, renderer_format, user_id, row_count, timestamps):
+    # (ETag, Last-Modified) for a response; also used by the async views
+    present = [timestamp for timestamp in timestamps if timestamp is not None]
+    fingerprint = '|'.join([
+        full_path,
+        renderer_format,
+        str(user_id),
+        str(row_count),
+        *(timestamp.isoformat() if timestamp else '-' for timestamp in timestamps)])
+    etag = f'"{hashlib.md5(fingerprint.encode("utf-8")).hexdigest()}"'
+    return etag, max(present) if present else None
+
+
+def set_conditional_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Validators depend on the caller, so shared caches must not reuse them
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for a viewset's read actions.
+
+    Validators come from one aggregate over the rows the action would return:
+    COUNT(*) plus MAX() of each field in conditional_timestamp_fields. They are
+    checked in initial(), after authentication and permissions, so a matching
+    If-None-Match / If-Modified-Since returns 304 before any serialization.
+    """
+    conditional_actions = ('list', 'retrieve')
+    conditional_timestamp_fields = ('updated_at',)
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_validators(self, request):
+        aggregates = {f'latest_{index}': Max(field) for index, field in enumerate(self.conditional_timestamp_fields)}
+        values = self.get_conditional_queryset().order_by().aggregate(row_count=Count('pk'), **aggregates)
+        user_id = request.user.pk if request.user.is_authenticated else 'anonymous'
+        return conditional_validators(
+            request.get_full_path(), request.accepted_renderer.format, user_id,
+            values['row_count'], [values[key] for key in aggregates])
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_etag = None
+        self.conditional_last_modified = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.conditional_actions:
+            return
+        try:
+            etag, last_modified = self.get_conditional_validators(request)
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup values; the action itself answers with a 404
+            return
+        self.conditional_etag = etag
+        # HTTP dates have second resolution
+        self.conditional_last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=self.conditional_last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, 'conditional_etag', None)
+        if etag and response.status_code in (200, 304):
+            set_conditional_headers(response, etag, self.conditional_last_modified)
+        return response
@@ -0,0 +1,62 @@
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.urls import resolve
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+# The regular URLconf; asgi_urls.py only puts the async views in front of it
+SYNC_URLCONF = 'appointment_system.urls'
+
+
+async def delegate(request):
+    # Anything a fast path does not handle itself is answered by the DRF view
+    match = resolve(request.path_info, urlconf=SYNC_URLCONF)
+    return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+
+
+def fast_path(view):
+    """
+    Marks an async view that serves plain GETs itself and hands every other
+    method to the synchronous view registered for the same URL.
+    """
+    @csrf_exempt
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await delegate(request)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def accepts_json(request):
+    # The browsable API (text/html) stays on the DRF views
+    accept = request.headers.get('Accept', '')
+    return 'text/html' not in accept and request.GET.get('format') in (None, 'json')
+
+
+async def authenticated_user(request):
+    """
+    request.user as DRF's authenticators would set it, or None when the
+    credentials are rejected (the caller delegates so DRF builds the 401).
+    """
+    if not request.headers.get('Authorization'):
+        return AnonymousUser()
+
+    def authenticate():
+        for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            result = authenticator_class().authenticate(request)
+            if result is not None:
+                return result[0]
+        return AnonymousUser()
+
+    try:
+        return await sync_to_async(authenticate)()
+    except exceptions.APIException:
+        return None
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False})
@@ -18,6 +18,7 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 EMAIL_VERIFICATION_TIMEOUT = 24  # Hours
 PASSWORD_RESET_TIMEOUT = 1  # Hours
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
+BACKEND_URL = os.environ.get('BACKEND_URL', 'http://localhost:8000')  # Absolute media URLs in stored snapshots
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -33,6 +34,12 @@ INSTALLED_APPS = [
     'businesses',
 ]
 
+# Records every issued refresh token (one INSERT per login and refresh) so that
+# BLACKLIST_AFTER_ROTATION can revoke rotated ones; prune them with prune_tokens
+JWT_TOKEN_BLACKLIST = os.environ.get('JWT_TOKEN_BLACKLIST', 'False') == 'True'
+if JWT_TOKEN_BLACKLIST:
+    INSTALLED_APPS.append('rest_framework_simplejwt.token_blacklist')
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -44,7 +51,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'appointment_system.urls'
+# asgi.py switches to appointment_system.asgi_urls (async fast paths)
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'appointment_system.urls')
 
 TEMPLATES = [
     {
@@ -72,6 +80,76 @@ DATABASES = {
     }
 }
 
+# JWT-authenticated users (accounts.authentication) are read on every request. With Redis
+# the cache is shared, so an invalidation reaches every worker; otherwise each worker keeps
+# them in memory and other workers see a change within AUTH_USER_CACHE_TIMEOUT
+AUTH_USER_CACHE = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'auth-users',
+    'OPTIONS': {'MAX_ENTRIES': 10000},
+}
+
+# Token buckets (appointment_system.throttling) are checked on every throttled request:
+# atomic in Redis when configured, otherwise kept per worker process in memory
+THROTTLE_CACHE = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'throttle-buckets',
+    'OPTIONS': {'MAX_ENTRIES': 50000},
+}
+
+# Shared cache tier: Redis in production, a file cache (shared by local worker processes) otherwise
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'auth': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'auth',
+        },
+        'throttle': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'throttle',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+        'auth': AUTH_USER_CACHE,
+        'throttle': THROTTLE_CACHE,
+    }
+
+# Per-process LRU tier in front of CACHES['default'] (appointment_system.cache). Cached
+# values are only shared through Redis; the file cache then just carries namespace versions
+CACHE_SHARE_VALUES = bool(REDIS_URL)
+LOCAL_CACHE_MAX_ENTRIES = 5000
+CACHE_VERSION_CHECK_INTERVAL = 2  # Seconds
+CACHE_BUILD_LOCK_TIMEOUT = 10  # Seconds
+CACHE_STATS_FLUSH_EVERY = 100
+AVAILABILITY_STALE_WHILE_REVALIDATE = 5  # Seconds a previous slot list is served while it is recomputed
+
+# Availability pre-warming (appointments.availability.prewarm_availability)
+AVAILABILITY_DEMAND_FLUSH_EVERY = 100  # Requests buffered before counts are written
+AVAILABILITY_DEMAND_FLUSH_INTERVAL = 60  # Seconds
+AVAILABILITY_DEMAND_WINDOW_DAYS = 7
+AVAILABILITY_PREWARM_TIMEOUT = 21600  # Seconds; bookings still invalidate pre-warmed entries
+AVAILABILITY_PREWARM_HOURS = (2, 6)  # Local hours in which --off-peak runs proceed
+
+# Live slot events (appointments.sse, served by asgi.py). Without Redis, events only reach
+# streams in the process that made the booking: run the API and the streams in one ASGI process
+SLOT_EVENTS_BROKER = 'appointments.events.RedisBroker' if REDIS_URL else 'appointments.events.LocalBroker'
+SLOT_EVENTS_MAX_CONNECTIONS = 1000  # Open streams per process before new ones get a 503
+SLOT_EVENTS_KEEPALIVE = 15  # Seconds
+SLOT_EVENTS_QUEUE_SIZE = 100  # Pending events per subscriber before new ones are dropped
+
 # User model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -100,6 +178,25 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# The pooled hasher uses Django's pbkdf2_sha256 algorithm name and verifies existing
+# hashes; listing PBKDF2PasswordHasher too would replace it for identify_hasher()
+PASSWORD_HASHERS = [
+    'accounts.hashers.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Larger appointment imports go through the import_appointments command instead of the API
+APPOINTMENT_IMPORT_MAX_UPLOAD_SIZE = 1024 * 1024  # Bytes
+
+# Password hashing process pool (0 workers hashes in the request thread)
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 2))
+PASSWORD_HASHING_MAX_QUEUE = int(os.environ.get('PASSWORD_HASHING_MAX_QUEUE', 16))
+PASSWORD_HASHING_QUEUE_TIMEOUT = 2  # Seconds
+PASSWORD_HASHING_START_METHOD = 'spawn'
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -119,22 +216,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    # Token bucket sizes for appointment_system.throttling.TokenBucketThrottle
+    'DEFAULT_THROTTLE_RATES': {
+        'available_slots': '60/min',
+        'password_reset': '5/hour',
+        'resend_verification': '5/hour',
+        'verification_status': '30/min',
+        'password_strength': '120/min',
+    }
 }
 
+# Seconds a JWT-authenticated user is served from cache before it is re-read; kept short
+# without Redis, where a deactivation only clears the cache of the worker that made it
+AUTH_USER_CACHE_TIMEOUT = 60 if REDIS_URL else 5
+
+# Debounced last_login updates on token issuance
+LAST_LOGIN_UPDATE_INTERVAL = 15  # Minutes
+LAST_LOGIN_FLUSH_SIZE = 100
+LAST_LOGIN_FLUSH_INTERVAL = 30  # Seconds
+
+# Seconds between full rebuilds of the in-memory autocomplete index
+AUTOCOMPLETE_REFRESH_INTERVAL = 300
+
+# Seconds the homepage by_category / featured listings stay cached
+BUSINESS_LISTINGS_CACHE_TIMEOUT = 300
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': False,  # Handled by accounts.last_login (debounced)
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'VERIFYING_KEY': None,
@@ -0,0 +1,87 @@
+import threading
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import SimpleRateThrottle
+
+# Refills and takes one token atomically; returns {allowed, tokens} (tokens as a
+# string, Lua numbers are truncated to integers on the way out)
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_second = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_per_second)
+if tokens < 1 then
+    return {0, tostring(tokens)}
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1, tostring(tokens - 1)}
+"""
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket rate limit keyed by client IP and the view's throttle_scope.
+
+    The scope's rate in DEFAULT_THROTTLE_RATES ('N/period') is the bucket size,
+    refilled continuously at N per period. Buckets live in CACHES['throttle']:
+    on Redis each check is one Lua script call, shared by every worker; on the
+    in-memory fallback it is a locked get/set in the worker's own memory, so
+    each worker process enforces the rate separately.
+    """
+    cache = caches['throttle']
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    _lock = threading.Lock()
+    _script = None
+
+    def __init__(self):
+        # The scope comes from the view, so rate parsing is deferred to allow_request()
+        self.wait_time = None
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        refill_per_second = self.num_requests / self.duration
+        if isinstance(self.cache, RedisCache):
+            allowed, tokens = self.take_token_redis(refill_per_second)
+        else:
+            allowed, tokens = self.take_token_local(refill_per_second)
+        if not allowed:
+            self.wait_time = (1 - tokens) / refill_per_second
+        return allowed
+
+    def take_token_local(self, refill_per_second):
+        with self._lock:
+            now = self.timer()
+            tokens, updated_at = self.cache.get(self.key, (self.num_requests, now))
+            tokens = min(self.num_requests, tokens + (now - updated_at) * refill_per_second)
+            if tokens < 1:
+                return False, tokens
+            self.cache.set(self.key, (tokens - 1, now), self.duration)
+            return True, tokens - 1
+
+    def take_token_redis(self, refill_per_second):
+        key = self.cache.make_and_validate_key(self.key)
+        client = self.cache._cache.get_client(key, write=True)
+        if TokenBucketThrottle._script is None:
+            TokenBucketThrottle._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        allowed, tokens = TokenBucketThrottle._script(
+            keys=[key], args=[self.num_requests, refill_per_second, self.timer(), self.duration], client=client)
+        return bool(allowed), float(tokens)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)}
+
+    def wait(self):
+        return self.wait_time
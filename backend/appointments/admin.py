@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Appointment
+from .models import Appointment, AvailabilityDemand, OwnerNotificationEvent
 
 @admin.register(Appointment)
 class AppointmentAdmin(admin.ModelAdmin):
@@ -7,3 +7,19 @@ class AppointmentAdmin(admin.ModelAdmin):
     list_filter = ('status', 'date', 'business')
     search_fields = ('client__username', 'client__email', 'business__name')
     date_hierarchy = 'date'
+
+
+@admin.register(OwnerNotificationEvent)
+class OwnerNotificationEventAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'event_type', 'appointment', 'cancelled_by', 'created_at')
+    list_filter = ('event_type', 'created_at')
+    search_fields = ('owner__username', 'owner__email')
+    list_select_related = ('owner', 'appointment')
+
+
+@admin.register(AvailabilityDemand)
+class AvailabilityDemandAdmin(admin.ModelAdmin):
+    list_display = ('service', 'business', 'day', 'request_count')
+    list_filter = ('day',)
+    search_fields = ('business__name', 'service__name')
+    list_select_related = ('service__business', 'business')
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+from businesses.models import Business, Service
+from appointment_system.fastpath import delegate, fast_path, json_response
+from appointment_system.throttling import TokenBucketThrottle
+from .availability import (
+    MAX_RANGE_DAYS, aget_available_slots, aget_available_slots_range, aperiods_by_weekday, encode_availability)
+from .views import AvailableTimeSlotsView
+
+
+@fast_path
+async def available_slots(request):
+    # AvailableTimeSlotsView on the async ORM; invalid input and throttled
+    # requests go to the DRF view, which builds the error response
+    encoding = request.GET.get('encoding', 'list')
+    try:
+        business_id, service_id = int(request.GET['business_id']), int(request.GET['service_id'])
+        date = datetime.strptime(request.GET['date'], '%Y-%m-%d').date()
+        days = int(request.GET.get('days', 1))
+    except (KeyError, ValueError):
+        return await delegate(request)
+    if encoding not in ('list', 'bitmap') or not 1 <= days <= MAX_RANGE_DAYS:
+        return await delegate(request)
+    try:
+        business = await Business.objects.aget(pk=business_id)
+        service = await Service.objects.aget(pk=service_id)
+    except (Business.DoesNotExist, Service.DoesNotExist):
+        return await delegate(request)
+    # Checked last: every delegated request is charged by AvailableTimeSlotsView instead
+    if not await sync_to_async(TokenBucketThrottle().allow_request)(request, AvailableTimeSlotsView):
+        return await delegate(request)
+    if encoding == 'list' and days == 1:
+        return json_response({'available_slots': await aget_available_slots(business, service, date)})
+    dates = [date + timedelta(days=offset) for offset in range(days)]
+    slots_by_date = await aget_available_slots_range(business, service, dates)
+    if encoding == 'bitmap':
+        return json_response(encode_availability(service, slots_by_date, await aperiods_by_weekday(business)))
+    return json_response({'days': [
+        {'date': day.isoformat(), 'available_slots': slots_by_date[day]} for day in dates]})
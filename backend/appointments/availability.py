@@ -0,0 +1,368 @@
+import asyncio
+import base64
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from time import monotonic
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from appointment_system.cache import MISSING, availability_cache
+from businesses.models import Business, Service
+from .models import AvailabilityDemand
+from .utils import (
+    SLOT_INCREMENT_MINUTES, agenerate_available_time_slots_range, filter_upcoming_slots,
+    generate_available_time_slots_range)
+import logging
+
+logger = logging.getLogger(__name__)
+
+COALESCE_WAIT_TIMEOUT = 30  # Seconds
+MAX_RANGE_DAYS = 62
+
+
+class RequestCoalescer:
+    """
+    Shares one in-flight computation per key between the threads of a worker.
+
+    The first caller computes and resolves a Future; identical callers that
+    arrive meanwhile wait on that Future instead of recomputing. If a result
+    for the key was produced within stale_seconds, waiters get it immediately
+    (stale-while-revalidate) while the first caller refreshes it.
+    """
+
+    def __init__(self, max_entries=2000):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.async_in_flight = {}
+        self.last_results = OrderedDict()
+        self.max_entries = max_entries
+
+    def run(self, key, compute, stale_seconds=0):
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+            last = self.last_results.get(key)
+        if not leader:
+            if last is not None and monotonic() - last[0] <= stale_seconds:
+                return last[1]
+            return future.result(timeout=COALESCE_WAIT_TIMEOUT)
+        try:
+            result = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            self.remember(key, result)
+            return result
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    async def arun(self, key, compute, stale_seconds=0):
+        # run() for coroutines: callers on the same event loop await the leader's future
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self.lock:
+            future = self.async_in_flight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self.async_in_flight[flight_key] = future
+            last = self.last_results.get(key)
+        if not leader:
+            if last is not None and monotonic() - last[0] <= stale_seconds:
+                return last[1]
+            return await asyncio.wait_for(asyncio.shield(future), COALESCE_WAIT_TIMEOUT)
+        try:
+            result = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark it retrieved in case nobody was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self.remember(key, result)
+            return result
+        finally:
+            with self.lock:
+                self.async_in_flight.pop(flight_key, None)
+
+    def remember(self, key, result):
+        with self.lock:
+            self.last_results[key] = (monotonic(), result)
+            self.last_results.move_to_end(key)
+            while len(self.last_results) > self.max_entries:
+                self.last_results.popitem(last=False)
+
+
+availability_coalescer = RequestCoalescer()
+
+
+class DemandCounter:
+    """
+    Buffers available-slots request counts per (business, service) in memory
+    and adds them to today's AvailabilityDemand rows every
+    AVAILABILITY_DEMAND_FLUSH_EVERY requests or flush interval.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.pending = 0
+        self.flushed_at = monotonic()
+
+    def record(self, business_id, service_id):
+        if self.count(business_id, service_id):
+            self.flush()
+
+    async def arecord(self, business_id, service_id):
+        if self.count(business_id, service_id):
+            await sync_to_async(self.flush)()
+
+    def count(self, business_id, service_id):
+        # Returns whether the buffer is due to be flushed
+        with self.lock:
+            self.counts[(business_id, service_id)] += 1
+            self.pending += 1
+            return (
+                self.pending >= getattr(settings, 'AVAILABILITY_DEMAND_FLUSH_EVERY', 100)
+                or monotonic() - self.flushed_at >= getattr(settings, 'AVAILABILITY_DEMAND_FLUSH_INTERVAL', 60))
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.pending = 0
+            self.flushed_at = monotonic()
+        day = timezone.now().date()
+        for (business_id, service_id), count in counts.items():
+            try:
+                updated = AvailabilityDemand.objects.filter(service_id=service_id, day=day).update(
+                    request_count=F('request_count') + count)
+                if not updated:
+                    try:
+                        with transaction.atomic():
+                            AvailabilityDemand.objects.create(
+                                business_id=business_id, service_id=service_id, day=day, request_count=count)
+                    except IntegrityError:
+                        # Another process created today's row first
+                        AvailabilityDemand.objects.filter(service_id=service_id, day=day).update(
+                            request_count=F('request_count') + count)
+            except Exception as e:
+                logger.warning(f"Could not store availability demand for service {service_id}: {e}")
+
+
+demand_counter = DemandCounter()
+
+
+def availability_cache_suffix(service_id, date):
+    # Cached lists hold the whole day; past slots are dropped per request
+    return f"{service_id}:{date.isoformat()}"
+
+
+def build_slots(business, service, date):
+    return generate_available_time_slots_range(business, [service], [date])[(service.id, date)]
+
+
+def get_available_slots(business, service, date):
+    demand_counter.record(business.id, service.id)
+    # Cache tiers first; on a miss identical concurrent requests share one computation
+    suffix = availability_cache_suffix(service.id, date)
+    slots = availability_cache.get(suffix, scope=business.id)
+    if slots is MISSING:
+        slots = availability_coalescer.run(
+            (business.id, suffix),
+            lambda: availability_cache.get_or_set(
+                suffix, lambda: build_slots(business, service, date), scope=business.id, record=False),
+            stale_seconds=getattr(settings, 'AVAILABILITY_STALE_WHILE_REVALIDATE', 5))
+    return filter_upcoming_slots(slots, date)
+
+
+def get_available_slots_range(business, service, dates):
+    # Cached days come from one get_many; the missing ones are computed in one batch
+    demand_counter.record(business.id, service.id)
+    suffixes = {date: availability_cache_suffix(service.id, date) for date in dates}
+    versions = availability_cache.current_versions(business.id)
+    cached = availability_cache.get_many(suffixes.values(), scope=business.id, versions=versions)
+    missing = [date for date, suffix in suffixes.items() if suffix not in cached]
+    if missing:
+        computed = generate_available_time_slots_range(business, [service], missing)
+        fresh = {suffixes[date]: computed[(service.id, date)] for date in missing}
+        availability_cache.set_many(fresh, scope=business.id, versions=versions)
+        cached.update(fresh)
+    return {date: filter_upcoming_slots(cached[suffix], date) for date, suffix in suffixes.items()}
+
+
+async def aget_available_slots(business, service, date):
+    # get_available_slots for the ASGI views, coalesced per event loop. Unlike
+    # get_or_set() there is no cross-process build lock on this path.
+    await demand_counter.arecord(business.id, service.id)
+    suffix = availability_cache_suffix(service.id, date)
+    cached = await availability_cache.aget_many([suffix], scope=business.id)
+    if suffix in cached:
+        return filter_upcoming_slots(cached[suffix], date)
+
+    async def build():
+        versions = await availability_cache.acurrent_versions(business.id)
+        slots = (await agenerate_available_time_slots_range(business, [service], [date]))[(service.id, date)]
+        await availability_cache.aset_many({suffix: slots}, scope=business.id, versions=versions)
+        return slots
+
+    slots = await availability_coalescer.arun(
+        (business.id, suffix), build,
+        stale_seconds=getattr(settings, 'AVAILABILITY_STALE_WHILE_REVALIDATE', 5))
+    return filter_upcoming_slots(slots, date)
+
+
+async def aget_available_slots_range(business, service, dates):
+    # get_available_slots_range for the ASGI views: async cache and ORM calls only
+    await demand_counter.arecord(business.id, service.id)
+    suffixes = {date: availability_cache_suffix(service.id, date) for date in dates}
+    versions = await availability_cache.acurrent_versions(business.id)
+    cached = await availability_cache.aget_many(suffixes.values(), scope=business.id, versions=versions)
+    missing = [date for date, suffix in suffixes.items() if suffix not in cached]
+    if missing:
+        computed = await agenerate_available_time_slots_range(business, [service], missing)
+        fresh = {suffixes[date]: computed[(service.id, date)] for date in missing}
+        await availability_cache.aset_many(fresh, scope=business.id, versions=versions)
+        cached.update(fresh)
+    return {date: filter_upcoming_slots(cached[suffix], date) for date, suffix in suffixes.items()}
+
+
+def periods_by_weekday(business):
+    return weekday_periods(business.business_hours.prefetch_related('time_periods_set'))
+
+
+async def aperiods_by_weekday(business):
+    return weekday_periods([
+        business_hours async for business_hours in business.business_hours.prefetch_related('time_periods_set')])
+
+
+def weekday_periods(hours):
+    periods = {}
+    for business_hours in hours:
+        if not business_hours.is_closed:
+            periods[business_hours.day] = sorted(
+                business_hours.time_periods_set.all(), key=lambda period: period.start_time)
+    return periods
+
+
+def encode_slot_bitmap(slots, periods):
+    """
+    Compact form of one day's slots. Each period contributes one bit per
+    SLOT_INCREMENT_MINUTES step from its start time (most significant bit
+    first, periods in header order); a set bit means a slot of `duration`
+    minutes starts there. Returns (header periods, base64 bitmap).
+    """
+    header = []
+    offsets = {}
+    bit_count = 0
+    for period in periods:
+        start = period.start_time.hour * 60 + period.start_time.minute
+        end = period.end_time.hour * 60 + period.end_time.minute
+        steps = max(0, -(-(end - start) // SLOT_INCREMENT_MINUTES))
+        name = period.period_name or f'Period {period.id}'
+        header.append([period.start_time.strftime('%H:%M'), period.end_time.strftime('%H:%M'), name, steps])
+        offsets.setdefault(name, []).append((start, bit_count, steps))
+        bit_count += steps
+    bitmap = bytearray(-(-bit_count // 8))
+    for slot in slots:
+        hours, minutes = map(int, slot['start_time'].split(':'))
+        for period_start, first_bit, steps in offsets.get(slot['period_name'], ()):
+            step, remainder = divmod(hours * 60 + minutes - period_start, SLOT_INCREMENT_MINUTES)
+            if not remainder and 0 <= step < steps:
+                bit = first_bit + step
+                bitmap[bit // 8] |= 0x80 >> (bit % 8)
+                break
+    return header, base64.b64encode(bytes(bitmap)).decode('ascii')
+
+
+def encode_availability(service, slots_by_date, periods):
+    days = []
+    for date, slots in sorted(slots_by_date.items()):
+        header, bitmap = encode_slot_bitmap(slots, periods.get(date.weekday(), []))
+        days.append({'date': date.isoformat(), 'periods': header, 'bitmap': bitmap})
+    return {
+        'encoding': 'bitmap',
+        'granularity': SLOT_INCREMENT_MINUTES,
+        'duration': service.duration,
+        'days': days}
+
+
+def most_requested_services(top, window_days=None):
+    window_days = window_days or getattr(settings, 'AVAILABILITY_DEMAND_WINDOW_DAYS', 7)
+    since = timezone.now().date() - timedelta(days=window_days)
+    return list(
+        AvailabilityDemand.objects.filter(
+            day__gte=since, business__is_active=True, service__is_active=True)
+        .values('business_id', 'service_id')
+        .annotate(requests=Sum('request_count'))
+        .order_by('-requests')[:top])
+
+
+def prewarm_business(business, services, dates):
+    try:
+        # Versions are captured before reading, so a booking made meanwhile invalidates the result
+        versions = availability_cache.current_versions(business.id)
+        slots = generate_available_time_slots_range(business, services, dates)
+        availability_cache.set_many(
+            {availability_cache_suffix(service_id, date): day_slots for (service_id, date), day_slots in slots.items()},
+            scope=business.id,
+            versions=versions,
+            timeout=getattr(settings, 'AVAILABILITY_PREWARM_TIMEOUT', 21600))
+        return len(slots)
+    finally:
+        # Worker threads open their own connections
+        connections.close_all()
+
+
+def prewarm_availability(days=7, top=50, concurrency=4):
+    """
+    Writes the next `days` days of slots for the `top` most requested services
+    into the availability cache, one batch per business, with at most
+    `concurrency` businesses computed at once.
+    """
+    started = monotonic()
+    demand = most_requested_services(top)
+    service_ids_by_business = {}
+    for row in demand:
+        service_ids_by_business.setdefault(row['business_id'], []).append(row['service_id'])
+    businesses = Business.objects.in_bulk(list(service_ids_by_business))
+    services = Service.objects.in_bulk([row['service_id'] for row in demand])
+    today = timezone.now().date()
+    dates = [today + timedelta(days=offset) for offset in range(days)]
+    entries = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {
+            executor.submit(prewarm_business, businesses[business_id], [services[pk] for pk in service_ids], dates): business_id
+            for business_id, service_ids in service_ids_by_business.items()}
+        for future, business_id in futures.items():
+            try:
+                entries += future.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to pre-warm availability for business {business_id}: {e}")
+    cutoff = today - timedelta(days=getattr(settings, 'AVAILABILITY_DEMAND_WINDOW_DAYS', 7))
+    AvailabilityDemand.objects.filter(day__lt=cutoff).delete()
+    elapsed = monotonic() - started
+    logger.info(f"Pre-warmed {entries} availability entries for {len(demand)} services in {elapsed:.2f}s")
+    return {
+        'services': len(demand),
+        'businesses': len(service_ids_by_business) - failed,
+        'failed': failed,
+        'entries': entries,
+        'elapsed': elapsed}
+
+
+def in_prewarm_window(now=None):
+    start_hour, end_hour = getattr(settings, 'AVAILABILITY_PREWARM_HOURS', (2, 6))
+    hour = timezone.localtime(now).hour
+    return start_hour <= hour < end_hour
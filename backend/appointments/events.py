@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+from time import sleep
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class LocalBroker:
+    """
+    In-process publish/subscribe for slot events, keyed by (business_id, date).
+
+    publish() may be called from any thread (request workers, management
+    commands); events are handed to each subscriber's event loop with
+    call_soon_threadsafe. Single-process only: a booking made in a WSGI worker
+    or another ASGI worker never reaches these subscribers, so it only suits a
+    deployment where one ASGI process serves both the API and the streams.
+    Anything else needs RedisBroker (the default when REDIS_URL is set).
+
+    At most SLOT_EVENTS_MAX_CONNECTIONS subscriptions are open per process;
+    subscribe() raises TooManySubscribers past that.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.count = 0
+
+    def subscribe(self, channel):
+        # Must be called from the subscriber's event loop
+        queue = asyncio.Queue(maxsize=getattr(settings, 'SLOT_EVENTS_QUEUE_SIZE', 100))
+        with self.lock:
+            if self.count >= getattr(settings, 'SLOT_EVENTS_MAX_CONNECTIONS', 1000):
+                raise TooManySubscribers()
+            self.subscribers.setdefault(channel, set()).add((asyncio.get_running_loop(), queue))
+            self.count += 1
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        with self.lock:
+            subscribers = self.subscribers.get(channel, set())
+            removed = {entry for entry in subscribers if entry[1] is queue}
+            subscribers.difference_update(removed)
+            self.count -= len(removed)
+            if not subscribers:
+                self.subscribers.pop(channel, None)
+
+    def publish(self, channel, event):
+        return self.deliver_local(channel, event)
+
+    def deliver_local(self, channel, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(deliver, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(channel, queue)
+        return len(subscribers)
+
+
+class RedisBroker(LocalBroker):
+    """
+    LocalBroker fanned out through Redis pub/sub, so an event published by any
+    process (WSGI workers included) reaches the streams open in every ASGI
+    process. publish() only sends to Redis; one listener thread per process,
+    started with the first subscription, pattern-subscribes to all slot
+    channels and hands messages to this process's subscribers.
+    """
+    prefix = 'slot_events:'
+
+    def __init__(self, url=None):
+        super().__init__()
+        import redis
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.listener = None
+
+    def subscribe(self, channel):
+        queue = super().subscribe(channel)
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name='slot-events-listener', daemon=True)
+                self.listener.start()
+        return queue
+
+    def publish(self, channel, event):
+        # Number of listening processes, not streams
+        return self.client.publish(f"{self.prefix}{channel}", json.dumps(event))
+
+    def listen(self):
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(f"{self.prefix}*")
+                for message in pubsub.listen():
+                    channel = message['channel'].decode('utf-8')[len(self.prefix):]
+                    self.deliver_local(channel, json.loads(message['data']))
+            except Exception as e:
+                # Events published while disconnected are lost; pages refetch on reconnect anyway
+                logger.error(f"Slot event listener lost its Redis connection: {e}")
+                sleep(1)
+            finally:
+                pubsub.close()
+
+
+def deliver(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        logger.warning(f"Dropping slot event for a slow subscriber: {event['type']}")
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, 'SLOT_EVENTS_BROKER', 'appointments.events.LocalBroker'))()
+    return _broker
+
+
+def slot_channel(business_id, date):
+    # date may be a date or its ISO string
+    return f"{business_id}:{date}"
+
+
+def slot_event(event_type, business_id, service_id, date, start_time, end_time):
+    return {
+        'type': event_type,
+        'business_id': business_id,
+        'service_id': service_id,
+        'date': date.isoformat(),
+        'start_time': start_time.strftime('%H:%M'),
+        'end_time': end_time.strftime('%H:%M')}
+
+
+def publish_on_commit(events):
+    # Subscribers refetch on an event, so it must not arrive before the row is visible
+    if not events:
+        return
+    def publish():
+        broker = get_broker()
+        for event in events:
+            try:
+                broker.publish(slot_channel(event['business_id'], event['date']), event)
+            except Exception as e:
+                logger.error(f"Failed to publish slot event: {e}")
+    transaction.on_commit(publish)
+
+
+def appointment_slot_events(appointment, previous=None, deleted=False):
+    """
+    slot_taken / slot_freed events for one appointment write. `previous` is
+    Appointment.held_slot() as loaded from the database (None for a new or
+    inactive appointment, False if unknown).
+    """
+    current = None if deleted else appointment.held_slot()
+    if previous == current:
+        return []
+    events = []
+    for event_type, slot in (('slot_freed', previous), ('slot_taken', current)):
+        if slot:
+            date, start_time, end_time, service_id = slot
+            events.append(slot_event(event_type, appointment.business_id, service_id, date, start_time, end_time))
+    return events
@@ -0,0 +1,312 @@
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils.crypto import get_random_string
+from businesses.models import Service
+from appointment_system.cache import analytics_cache, availability_cache
+from .availability import periods_by_weekday
+from .events import appointment_slot_events, publish_on_commit
+from .models import Appointment
+import logging
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_STATUSES = ('pending', 'confirmed', 'completed', 'cancelled')
+BLOCKING_STATUSES = ('pending', 'confirmed')
+
+
+def iter_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        # DictReader counts the header as line 1
+        yield reader.line_num, row, None
+
+
+def iter_jsonl_rows(stream):
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object."
+            continue
+        yield line_number, row, None
+
+
+def iter_import_rows(stream, import_format):
+    if import_format == 'csv':
+        return iter_csv_rows(stream)
+    if import_format == 'jsonl':
+        return iter_jsonl_rows(stream)
+    raise ValueError(f"Unsupported import format '{import_format}'. Use one of: {', '.join(IMPORT_FORMATS)}")
+
+
+def guess_import_format(filename):
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return 'csv'
+
+
+class AppointmentImporter:
+    """
+    Streams client/appointment rows for one business into the database.
+
+    Rows are processed in batches: clients are resolved with one email lookup per
+    batch and deduplicated in memory, pending/confirmed rows must fall inside the
+    business hours and are checked for overlaps against one query per batch
+    (re-read every batch, so bookings made during a long import count), and
+    everything is inserted with bulk_create. A batch the database
+    rejects is retried row by row, so only the offending rows are reported. A
+    file that stops decoding part-way keeps the batches already imported. No
+    emails are sent.
+    """
+
+    def __init__(self, business, batch_size=IMPORT_BATCH_SIZE):
+        self.business = business
+        self.batch_size = batch_size
+        self.services_by_id = {}
+        self.services_by_name = {}
+        for service in Service.objects.filter(business=business):
+            self.services_by_id[str(service.id)] = service
+            self.services_by_name[service.name.strip().lower()] = service
+        self.clients = {}
+        self.periods = periods_by_weekday(business)
+        self.booked = defaultdict(list)
+        self.errors = []
+        self.rows_read = 0
+        self.clients_created = 0
+        self.appointments_created = 0
+
+    def run(self, rows):
+        batch = []
+        row_number = 0
+        try:
+            for row_number, row, error in rows:
+                self.rows_read += 1
+                if error:
+                    self.add_error(row_number, error)
+                    continue
+                batch.append((row_number, row))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+        except UnicodeDecodeError:
+            # Earlier batches are already committed, so report them rather than failing the import
+            self.add_error(row_number + 1, "The file must be UTF-8 encoded; this and later rows were not read.")
+        if batch:
+            self.import_batch(batch)
+        if self.appointments_created:
+            # bulk_create sends no post_save, so the signal-driven invalidation never runs
+            availability_cache.invalidate_on_commit(scope=self.business.id)
+            analytics_cache.invalidate_on_commit()
+        logger.info(
+            f"Import for business {self.business.id}: {self.rows_read} rows, "
+            f"{self.clients_created} clients, {self.appointments_created} appointments, {len(self.errors)} errors")
+        return self.report()
+
+    def report(self):
+        return {
+            'rows': self.rows_read,
+            'clients_created': self.clients_created,
+            'appointments_created': self.appointments_created,
+            'errors': sorted(self.errors, key=lambda error: error['row'])}
+
+    def add_error(self, row_number, message):
+        self.errors.append({'row': row_number, 'error': message})
+
+    def clean_row(self, row_number, row):
+        def value(key):
+            return str(row.get(key) or '').strip()
+        first_name = value('first_name')
+        last_name = value('last_name')
+        email = value('email')
+        if not (first_name or last_name or email):
+            return self.add_error(row_number, "A client first_name, last_name or email is required.")
+        service_ref = value('service') or value('service_id')
+        service = self.services_by_id.get(service_ref) or self.services_by_name.get(service_ref.lower())
+        if not service:
+            return self.add_error(row_number, f"Unknown service '{service_ref}' for this business.")
+        try:
+            date = datetime.strptime(value('date'), '%Y-%m-%d').date()
+        except ValueError:
+            return self.add_error(row_number, "date must use the YYYY-MM-DD format.")
+        try:
+            start_time = datetime.strptime(value('start_time')[:5], '%H:%M').time()
+        except ValueError:
+            return self.add_error(row_number, "start_time must use the HH:MM format.")
+        start_datetime = datetime.combine(date, start_time)
+        end_datetime = start_datetime + timedelta(minutes=service.duration)
+        if end_datetime.date() != date:
+            return self.add_error(row_number, "Appointment cannot run past midnight.")
+        status = value('status').lower() or 'confirmed'
+        if status not in IMPORT_STATUSES:
+            return self.add_error(row_number, f"status must be one of: {', '.join(IMPORT_STATUSES)}.")
+        phone = value('phone_number') or value('phone')
+        if email:
+            client_key = ('email', email.lower())
+        elif phone:
+            client_key = ('name', first_name.lower(), last_name.lower(), phone)
+        else:
+            client_key = ('row', row_number)
+        return {
+            'row': row_number,
+            'client_key': client_key,
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': email,
+            'phone_number': phone,
+            'service': service,
+            'date': date,
+            'start_time': start_time,
+            'end_time': end_datetime.time(),
+            'status': status,
+            'notes': value('notes')}
+
+    def load_existing_clients(self, entries):
+        emails = {entry['email'].lower() for entry in entries
+                  if entry['email'] and entry['client_key'] not in self.clients}
+        if not emails:
+            return
+        # Emails are only unique case-sensitively; the oldest account wins
+        users = User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails).order_by('-pk')
+        for user in users:
+            self.clients[('email', user.email_lower)] = user
+
+    def load_booked_slots(self, entries):
+        # Earlier batches are committed by now, so the query also covers them
+        self.booked = defaultdict(list)
+        dates = {entry['date'] for entry in entries}
+        existing = Appointment.objects.filter(
+            business=self.business,
+            date__in=dates,
+            status__in=BLOCKING_STATUSES).values_list('date', 'start_time', 'end_time')
+        for date, start_time, end_time in existing:
+            self.booked[date].append((start_time, end_time))
+
+    def within_business_hours(self, entry):
+        return any(
+            period.start_time <= entry['start_time'] and entry['end_time'] <= period.end_time
+            for period in self.periods.get(entry['date'].weekday(), ()))
+
+    def has_conflict(self, entry):
+        for start_time, end_time in self.booked[entry['date']]:
+            if entry['start_time'] < end_time and entry['end_time'] > start_time:
+                return True
+        return False
+
+    def build_client(self, entry):
+        base_username = f"walkin_{entry['first_name']}_{entry['last_name']}".lower().replace(' ', '_')
+        username = f"{base_username}_{get_random_string(8, 'abcdefghijklmnopqrstuvwxyz0123456789')}"
+        return User(
+            username=username,
+            email=entry['email'] or f"{username}@walkin.local",
+            first_name=entry['first_name'],
+            last_name=entry['last_name'],
+            phone_number=entry['phone_number'],
+            user_type='client',
+            password=make_password(None))
+
+    def import_batch(self, batch):
+        entries = [entry for entry in (self.clean_row(row_number, row) for row_number, row in batch) if entry]
+        if not entries:
+            return
+        self.load_existing_clients(entries)
+        self.load_booked_slots(entries)
+        accepted = []
+        new_clients = {}
+        for entry in entries:
+            if entry['status'] in BLOCKING_STATUSES:
+                if not self.within_business_hours(entry):
+                    self.add_error(
+                        entry['row'],
+                        f"{entry['date']} {entry['start_time'].strftime('%H:%M')} is outside the business hours.")
+                    continue
+                if self.has_conflict(entry):
+                    self.add_error(
+                        entry['row'],
+                        f"Time slot {entry['date']} {entry['start_time'].strftime('%H:%M')} is already booked.")
+                    continue
+                self.booked[entry['date']].append((entry['start_time'], entry['end_time']))
+            client_key = entry['client_key']
+            if client_key not in self.clients and client_key not in new_clients:
+                new_clients[client_key] = self.build_client(entry)
+            accepted.append(entry)
+        try:
+            with transaction.atomic():
+                resolved, appointments = self.save_entries(accepted, new_clients)
+        except IntegrityError as e:
+            logger.warning(f"Import batch failed for business {self.business.id}, retrying row by row: {str(e)}")
+            resolved, appointments = self.save_entries_one_by_one(accepted, new_clients)
+        self.clients.update(resolved)
+        self.clients_created += len(resolved)
+        self.appointments_created += len(appointments)
+        # Same reason as the cache invalidation in run(): no post_save to publish slot events
+        publish_on_commit([event for appointment in appointments for event in appointment_slot_events(appointment)])
+
+    def build_appointment(self, entry, client):
+        return Appointment(
+            client=client,
+            business=self.business,
+            service=entry['service'],
+            date=entry['date'],
+            start_time=entry['start_time'],
+            end_time=entry['end_time'],
+            status=entry['status'],
+            notes=entry['notes'] or None)
+
+    def create_clients(self, users):
+        created = User.objects.bulk_create(users, batch_size=self.batch_size)
+        if any(user.pk is None for user in created):
+            saved = User.objects.in_bulk([user.username for user in created], field_name='username')
+            created = [saved[user.username] for user in created]
+        return created
+
+    def save_entries(self, accepted, new_clients):
+        resolved = {}
+        if new_clients:
+            resolved = dict(zip(new_clients.keys(), self.create_clients(list(new_clients.values()))))
+        appointments = [
+            self.build_appointment(entry, resolved.get(entry['client_key']) or self.clients[entry['client_key']])
+            for entry in accepted]
+        Appointment.objects.bulk_create(appointments, batch_size=self.batch_size)
+        return resolved, appointments
+
+    def save_entries_one_by_one(self, accepted, new_clients):
+        # Each row gets its own savepoint; a new client is only kept with its first saved appointment
+        resolved = {}
+        appointments = []
+        for entry in accepted:
+            client_key = entry['client_key']
+            try:
+                with transaction.atomic():
+                    client = resolved.get(client_key) or self.clients.get(client_key)
+                    if client is None:
+                        client = self.create_clients([new_clients[client_key]])[0]
+                    appointment = self.build_appointment(entry, client)
+                    Appointment.objects.bulk_create([appointment])
+            except IntegrityError as e:
+                if client_key in new_clients and client_key not in resolved:
+                    # Let the next row for this client insert it again after the rollback
+                    new_clients[client_key].pk = None
+                    new_clients[client_key]._state.adding = True
+                self.add_error(entry['row'], f"Could not be saved: {str(e)}")
+                if entry['status'] in BLOCKING_STATUSES:
+                    self.booked[entry['date']].remove((entry['start_time'], entry['end_time']))
+                continue
+            if client_key in new_clients:
+                resolved[client_key] = client
+            appointments.append(appointment)
+        return resolved, appointments
@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from appointment_system.benchmarking import Scenario, http_request, run_mixed_load, format_report
+
+class Command(BaseCommand):
+    help = ('Measure requests per second and p99 latency of the hot read endpoints against running servers. '
+            'For WSGI vs ASGI at equal memory, start the same number of worker processes, e.g. '
+            '"gunicorn appointment_system.wsgi -w 4 -b :8000" and '
+            '"uvicorn appointment_system.asgi:application --workers 4 --port 8001", then pass '
+            '--base-url http://localhost:8000 --compare-url http://localhost:8001. Available slots are '
+            'throttled per client IP, so raise the available_slots rate for the run or 429s show up as errors.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--compare-url', help='Second deployment measured with the same load')
+        parser.add_argument('--business-id', type=int, required=True)
+        parser.add_argument('--service-id', type=int, required=True)
+        parser.add_argument('--concurrency', type=int, default=16, help='Threads per endpoint')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds per deployment')
+
+    def handle(self, *args, **options):
+        slots_date = (date.today() + timedelta(days=1)).isoformat()
+        paths = {
+            'available_slots': (
+                f"/api/appointments/available-slots/?business_id={options['business_id']}"
+                f"&service_id={options['service_id']}&date={slots_date}"),
+            'business_list': '/api/businesses/',
+            'business_detail': f"/api/businesses/{options['business_id']}/"}
+        for base_url in filter(None, [options['base_url'], options['compare_url']]):
+            base_url = base_url.rstrip('/')
+            scenarios = [
+                Scenario(name, options['concurrency'], lambda url=f"{base_url}{path}": http_request(url))
+                for name, path in paths.items()]
+            self.stdout.write(f"Running load against {base_url} for {options['duration']:.0f}s...")
+            run_mixed_load(scenarios, options['duration'])
+            for line in format_report(scenarios, options['duration']):
+                self.stdout.write(line)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from businesses.models import Business
+from appointments.importers import (
+    AppointmentImporter, iter_import_rows, guess_import_format, IMPORT_FORMATS, IMPORT_BATCH_SIZE)
+
+class Command(BaseCommand):
+    help = 'Import walk-in clients and appointments for a business from a CSV or JSON Lines file (no emails are sent)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('business_id', type=int, help='Business the appointments belong to')
+        parser.add_argument('path', help='CSV or JSON Lines file to import')
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='File format (guessed from the file extension by default)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Rows checked and inserted per batch')
+
+    def handle(self, *args, **options):
+        try:
+            business = Business.objects.get(pk=options['business_id'])
+        except Business.DoesNotExist:
+            raise CommandError(f"Business {options['business_id']} does not exist")
+        import_format = options['format'] or guess_import_format(options['path'])
+        self.stdout.write(f"Importing {options['path']} ({import_format}) into {business.name}...")
+        importer = AppointmentImporter(business, batch_size=options['batch_size'])
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            report = importer.run(iter_import_rows(stream, import_format))
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['error']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {report['rows']} rows: created {report['clients_created']} clients and "
+            f"{report['appointments_created']} appointments, {len(report['errors'])} rows rejected"))
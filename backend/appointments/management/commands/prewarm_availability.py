@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from appointments.availability import demand_counter, in_prewarm_window, prewarm_availability
+
+class Command(BaseCommand):
+    help = 'Precompute available slots for the most requested services into the availability cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Number of upcoming days to compute, starting today')
+        parser.add_argument('--top', type=int, default=50, help='Number of most requested services to pre-warm')
+        parser.add_argument('--concurrency', type=int, default=4, help='Businesses computed at the same time')
+        parser.add_argument(
+            '--off-peak',
+            action='store_true',
+            help='Only run inside AVAILABILITY_PREWARM_HOURS (for an hourly cron entry)')
+
+    def handle(self, *args, **options):
+        if options['off_peak'] and not in_prewarm_window():
+            self.stdout.write('Outside the pre-warm window, nothing to do')
+            return
+        demand_counter.flush()
+        self.stdout.write('Pre-warming availability...')
+        stats = prewarm_availability(days=options['days'], top=options['top'], concurrency=options['concurrency'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Cached {stats['entries']} day lists for {stats['services']} services "
+            f"across {stats['businesses']} businesses ({stats['failed']} failed) in {stats['elapsed']:.2f}s"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from appointments.utils import send_owner_digests
+
+class Command(BaseCommand):
+    help = 'Send the daily appointment digest to business owners who opted in'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Collecting queued owner notifications...')
+        stats = send_owner_digests()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {stats['sent']} digests ({stats['failed']} failed) covering {stats['events']} events"))
@@ -1,10 +1,19 @@
 from django.core.management.base import BaseCommand
-from appointments.utils import check_and_send_reminders
+from appointments.utils import check_and_send_reminders, REMINDER_BATCH_SIZE
 
 class Command(BaseCommand):
     help = 'Send email reminders for upcoming appointments'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REMINDER_BATCH_SIZE,
+            help='Number of appointments fetched and flagged per query')
+
     def handle(self, *args, **options):
         self.stdout.write('Checking for appointments to send reminders...')
-        check_and_send_reminders()
-        self.stdout.write(self.style.SUCCESS('Successfully sent appointment reminders'))
\ No newline at end of file
+        stats = check_and_send_reminders(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {stats['sent']} reminders ({stats['failed']} failed) in {stats['elapsed']:.2f}s "
+            f"- {stats['per_second']:.1f} appointments/s"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_ownernotificationevent'),
+        ('businesses', '0010_businesssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityDemand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_demand', to='businesses.business')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_demand', to='businesses.service')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='appointment_day_448b57_idx')],
+                'unique_together': {('service', 'day')},
+            },
+        ),
+    ]
@@ -29,3 +29,53 @@ class Appointment(models.Model):
     
     def __str__(self):
         return f"{self.client.username} - {self.business.name} - {self.date} {self.start_time}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_slot = instance.held_slot()
+        return instance
+
+    def held_slot(self):
+        # The slot this appointment blocks, for slot_taken / slot_freed events;
+        # False when the fields were deferred and the stored values are unknown
+        if any(field not in self.__dict__ for field in ('status', 'date', 'start_time', 'end_time', 'service_id')):
+            return False
+        if self.status not in ('pending', 'confirmed'):
+            return None
+        return (self.date, self.start_time, self.end_time, self.service_id)
+
+
+
+class OwnerNotificationEvent(models.Model):
+    EVENT_CHOICES = (
+        ('booked', 'Booked'),
+        ('cancelled', 'Cancelled'))
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_events')
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='owner_events')
+    event_type = models.CharField(max_length=10, choices=EVENT_CHOICES)
+    cancelled_by = models.CharField(max_length=10, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['owner', 'created_at']
+        indexes = [models.Index(fields=['owner', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.owner.username} - {self.event_type} - {self.appointment_id}"
+
+
+class AvailabilityDemand(models.Model):
+    """Daily available-slots request counts per service, used to pick what to pre-warm."""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='availability_demand')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='availability_demand')
+    day = models.DateField()
+    request_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('service', 'day')
+        indexes = [models.Index(fields=['day'])]
+
+    def __str__(self):
+        return f"{self.service_id} - {self.day}: {self.request_count}"
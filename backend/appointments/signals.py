@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from appointment_system.cache import analytics_cache, availability_cache
+from .events import appointment_slot_events, publish_on_commit
+from .models import Appointment
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_caches(sender, instance, **kwargs):
+    availability_cache.invalidate_on_commit(scope=instance.business_id)
+    analytics_cache.invalidate_on_commit()
+
+
+@receiver(post_save, sender=Appointment)
+def publish_slot_changes(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_slot', False)
+    publish_on_commit(appointment_slot_events(instance, previous))
+    instance._loaded_slot = instance.held_slot()
+
+
+@receiver(post_delete, sender=Appointment)
+def publish_slot_release(sender, instance, **kwargs):
+    publish_on_commit(appointment_slot_events(instance, getattr(instance, '_loaded_slot', instance.held_slot()), deleted=True))
@@ -0,0 +1,106 @@
+import asyncio
+import json
+from datetime import datetime
+from urllib.parse import parse_qs
+from django.conf import settings
+from .events import TooManySubscribers, get_broker, slot_channel
+import logging
+
+logger = logging.getLogger(__name__)
+
+SLOT_EVENTS_PATH = '/api/appointments/events/'
+
+
+def allowed_origin(origin):
+    if not origin:
+        return None
+    if getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) or origin in getattr(settings, 'CORS_ALLOWED_ORIGINS', []):
+        return origin
+    return None
+
+
+async def send_plain(send, status, text, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers]})
+    await send({'type': 'http.response.body', 'body': json.dumps({'detail': text}).encode('utf-8')})
+
+
+async def slot_events_app(scope, receive, send):
+    """
+    Server-sent events for one booking page:
+    GET /api/appointments/events/?business_id=<id>&date=YYYY-MM-DD streams
+    slot_taken / slot_freed events published for that business and date,
+    with a comment line every SLOT_EVENTS_KEEPALIVE seconds. Answers 503 once
+    SLOT_EVENTS_MAX_CONNECTIONS streams are open in this process.
+    """
+    if scope['method'] != 'GET':
+        await send_plain(send, 405, 'Method not allowed.')
+        return
+    params = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    try:
+        business_id = int(params['business_id'][0])
+        date = datetime.strptime(params['date'][0], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        await send_plain(send, 400, 'business_id and date (YYYY-MM-DD) are required parameters.')
+        return
+    headers = [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no')]
+    origin = allowed_origin(dict(scope.get('headers', [])).get(b'origin', b'').decode('latin-1'))
+    if origin:
+        headers.append((b'access-control-allow-origin', origin.encode('latin-1')))
+        headers.append((b'vary', b'Origin'))
+    channel = slot_channel(business_id, date)
+    broker = get_broker()
+    try:
+        queue = broker.subscribe(channel)
+    except TooManySubscribers:
+        # EventSource reconnects on its own; the page still works without live updates
+        await send_plain(send, 503, 'Too many open event streams.', [(b'retry-after', b'30')])
+        return
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    keepalive = getattr(settings, 'SLOT_EVENTS_KEEPALIVE', 15)
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+        while not disconnected.is_set():
+            getter = asyncio.ensure_future(queue.get())
+            stopper = asyncio.ensure_future(disconnected.wait())
+            done, pending = await asyncio.wait({getter, stopper}, timeout=keepalive, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            if getter in done:
+                event = getter.result()
+                body = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            elif stopper in done:
+                break
+            else:
+                body = ': keepalive\n\n'
+            await send({'type': 'http.response.body', 'body': body.encode('utf-8'), 'more_body': True})
+    except OSError:
+        pass
+    finally:
+        watcher.cancel()
+        broker.unsubscribe(channel, queue)
+    if not disconnected.is_set():
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+def route_slot_events(django_app):
+    # Streams are served directly: a Django view would hold a sync worker per open page
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == SLOT_EVENTS_PATH:
+            await slot_events_app(scope, receive, send)
+        else:
+            await django_app(scope, receive, send)
+    return application
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AppointmentViewSet, AvailableTimeSlotsView, AppointmentAnalyticsView
+from .views import AppointmentViewSet, AvailableTimeSlotsView, AppointmentAnalyticsView, CacheStatsView
 
 router = DefaultRouter()
 router.register(r'appointments', AppointmentViewSet, basename='appointment')
@@ -8,6 +8,7 @@ router.register(r'appointments', AppointmentViewSet, basename='appointment')
 urlpatterns = [
     path('appointments/available-slots/', AvailableTimeSlotsView.as_view(), name='available-slots'),
     path('analytics/', AppointmentAnalyticsView.as_view(), name='appointment-analytics'),
+    path('analytics/cache/', CacheStatsView.as_view(), name='cache-stats'),
     path('', include(router.urls))]
 
 
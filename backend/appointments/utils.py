@@ -4,12 +4,18 @@ from django.utils.html import strip_tags
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta, datetime, time
+from time import monotonic
 from businesses.models import BusinessHours, BusinessTimePeriod
-from appointments.models import Appointment
+from appointments.models import Appointment, OwnerNotificationEvent
+from itertools import groupby
 import logging
 
 logger = logging.getLogger(__name__)
 
+REMINDER_BATCH_SIZE = 200
+DIGEST_DELETE_BATCH_SIZE = 500
+SLOT_INCREMENT_MINUTES = 15
+
 
 def send_appointment_confirmation(appointment):
     logger.info(f"Sending appointment confirmation emails for appointment {appointment.id}")
@@ -43,21 +49,24 @@ def send_appointment_confirmation(appointment):
         except Exception as template_error:
             logger.warning(f"HTML template failed, sending simple email: {str(template_error)}")
             send_simple_client_email(appointment, context)
-        business_subject = f'🔔 New Appointment - {context["client_name"]}'
-        try:
-            business_html_message = render_to_string('emails/appointment_notification_business.html', context)
-            business_plain_message = strip_tags(business_html_message)
-            send_mail(
-                subject=business_subject,
-                message=business_plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[appointment.business.owner.email],
-                html_message=business_html_message,
-                fail_silently=False)
-            logger.info(f"Business HTML notification email sent to: {appointment.business.owner.email}")  
-        except Exception as template_error:
-            logger.warning(f"HTML template failed, sending simple email: {str(template_error)}")
-            send_simple_business_email(appointment, context)
+        if appointment.business.owner.business_digest_enabled:
+            queue_owner_event(appointment, 'booked')
+        else:
+            business_subject = f'🔔 New Appointment - {context["client_name"]}'
+            try:
+                business_html_message = render_to_string('emails/appointment_notification_business.html', context)
+                business_plain_message = strip_tags(business_html_message)
+                send_mail(
+                    subject=business_subject,
+                    message=business_plain_message,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[appointment.business.owner.email],
+                    html_message=business_html_message,
+                    fail_silently=False)
+                logger.info(f"Business HTML notification email sent to: {appointment.business.owner.email}")  
+            except Exception as template_error:
+                logger.warning(f"HTML template failed, sending simple email: {str(template_error)}")
+                send_simple_business_email(appointment, context)
         logger.info("All appointment confirmation emails sent successfully!")
     except Exception as e:
         logger.error(f"Critical error in send_appointment_confirmation: {str(e)}")
@@ -173,7 +182,7 @@ Test completed at: """ + timezone.now().strftime('%Y-%m-%d %H:%M:%S')
         return False
 
 
-def send_appointment_reminder(appointment):
+def send_appointment_reminder(appointment, mark_sent=True):
     subject = f'⏰ Reminder: Your appointment at {appointment.business.name} today'
     message = f"""
 Dear {appointment.client.first_name},
@@ -203,77 +212,123 @@ Best regards,
         from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[appointment.client.email],
         fail_silently=False)
-    appointment.email_reminder_sent = True
-    appointment.save(update_fields=['email_reminder_sent'])
+    if mark_sent:
+        appointment.email_reminder_sent = True
+        appointment.save(update_fields=['email_reminder_sent'])
     logger.info(f"⏰ Reminder email sent to: {appointment.client.email}")
 
 
 def generate_available_time_slots(business, service, date):
     logger.info(f"GENERATING SLOTS FOR: {business.name} on {date}")
-    now = timezone.now()
-    today = now.date()
-    current_time_only = now.time()
     day_of_week = date.weekday()
     try:
         business_hours = BusinessHours.objects.get(business=business, day=day_of_week)
         if business_hours.is_closed:
             logger.info(f"Business is closed on {business_hours.get_day_display()}")
             return []
-        time_periods = business_hours.time_periods_set.all().order_by('start_time')
-        if not time_periods.exists():
+        time_periods = list(business_hours.time_periods_set.all().order_by('start_time'))
+        if not time_periods:
             logger.info(f"No time periods set for {business_hours.get_day_display()}")
             return []
-        logger.info(f"Found {time_periods.count()} time periods:")
+        logger.info(f"Found {len(time_periods)} time periods:")
         for period in time_periods:
             logger.info(f"   - {period.period_name or 'Period'}: {period.start_time} - {period.end_time}")
     except BusinessHours.DoesNotExist:
         logger.info(f"No business hours set for day {day_of_week}")
         return []
-    from appointments.models import Appointment
-    existing_appointments = Appointment.objects.filter(
+    existing_appointments = list(Appointment.objects.filter(
         business=business,
         date=date,
-        status__in=['pending', 'confirmed']).order_by('start_time')
-    logger.info(f"Found {existing_appointments.count()} existing appointments")
-    service_duration = timedelta(minutes=service.duration)
-    slot_increment = timedelta(minutes=15) 
+        status__in=['pending', 'confirmed']).order_by('start_time'))
+    logger.info(f"Found {len(existing_appointments)} existing appointments")
+    available_slots = filter_upcoming_slots(
+        build_day_slots(date, time_periods, existing_appointments, service.duration), date)
+    logger.info(f"\nSUMMARY: Generated {len(available_slots)} available slots")
+    return available_slots
+
+
+def build_day_slots(date, time_periods, appointments, duration):
+    # Every free slot of the day, regardless of the current time (see filter_upcoming_slots)
+    service_duration = timedelta(minutes=duration)
+    slot_increment = timedelta(minutes=SLOT_INCREMENT_MINUTES)
+    busy = [
+        (datetime.combine(date, appointment.start_time), datetime.combine(date, appointment.end_time))
+        for appointment in appointments]
     available_slots = []
     for period in time_periods:
-        logger.info(f"\nProcessing period: {period.start_time} - {period.end_time}")
-        period_start = datetime.combine(date, period.start_time)
         period_end = datetime.combine(date, period.end_time)
-        current_time = period_start
+        current_time = datetime.combine(date, period.start_time)
         while current_time + service_duration <= period_end:
             slot_end_time = current_time + service_duration
-            is_slot_in_future = True
-            if date == today:
-                slot_start_time_only = current_time.time()
-                current_time_with_buffer = (now + timedelta(minutes=30)).time()
-                if slot_start_time_only <= current_time_with_buffer:
-                    is_slot_in_future = False
-                    logger.info(f"   Slot {current_time.time()} is too soon (current time + buffer: {current_time_with_buffer})")
-            if is_slot_in_future:
-                is_available = True
-                for appointment in existing_appointments:
-                    appointment_start = datetime.combine(date, appointment.start_time)
-                    appointment_end = datetime.combine(date, appointment.end_time)
-                    if (current_time < appointment_end and slot_end_time > appointment_start):
-                        is_available = False
-                        logger.info(f"    Slot {current_time.time()} - {slot_end_time.time()} conflicts with existing appointment")
-                        break
-                if is_available:
-                    slot = {
-                        'start_time': current_time.strftime('%H:%M'),
-                        'end_time': slot_end_time.strftime('%H:%M'),
-                        'period_name': period.period_name or f'Period {period.id}'}
-                    available_slots.append(slot)
-                    logger.info(f"    Available: {slot['start_time']} - {slot['end_time']}")
+            if not any(current_time < busy_end and slot_end_time > busy_start for busy_start, busy_end in busy):
+                available_slots.append({
+                    'start_time': current_time.strftime('%H:%M'),
+                    'end_time': slot_end_time.strftime('%H:%M'),
+                    'period_name': period.period_name or f'Period {period.id}'})
             current_time += slot_increment
-    logger.info(f"\nSUMMARY: Generated {len(available_slots)} available slots")
     return available_slots
 
 
-def check_and_send_reminders():
+def filter_upcoming_slots(slots, date, now=None):
+    # Today's slots must start more than 30 minutes from now
+    now = now or timezone.now()
+    if date != now.date():
+        return slots
+    current_time_with_buffer = (now + timedelta(minutes=30)).time()
+    return [slot for slot in slots if time.fromisoformat(slot['start_time']) > current_time_with_buffer]
+
+
+def generate_available_time_slots_range(business, services, dates):
+    """
+    Batch variant of generate_available_time_slots: full-day slots for every
+    (service, date) pair of one business, from one hours query and one
+    appointments query. Returns {(service_id, date): slots}.
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return {}
+    hours = BusinessHours.objects.filter(business=business).prefetch_related('time_periods_set')
+    appointments = range_appointments(business, dates)
+    return assemble_range_slots(hours, appointments, services, dates)
+
+
+async def agenerate_available_time_slots_range(business, services, dates):
+    # Same queries as generate_available_time_slots_range, through the async ORM
+    dates = sorted(set(dates))
+    if not dates:
+        return {}
+    hours = [
+        business_hours async for business_hours in
+        BusinessHours.objects.filter(business=business).prefetch_related('time_periods_set')]
+    appointments = [appointment async for appointment in range_appointments(business, dates)]
+    return assemble_range_slots(hours, appointments, services, dates)
+
+
+def range_appointments(business, dates):
+    return Appointment.objects.filter(
+        business=business,
+        date__range=(dates[0], dates[-1]),
+        status__in=['pending', 'confirmed']).order_by('date', 'start_time')
+
+
+def assemble_range_slots(hours, appointments, services, dates):
+    hours_by_day = {business_hours.day: business_hours for business_hours in hours}
+    appointments_by_date = {}
+    for appointment in appointments:
+        appointments_by_date.setdefault(appointment.date, []).append(appointment)
+    slots = {}
+    for date in dates:
+        business_hours = hours_by_day.get(date.weekday())
+        periods = [] if business_hours is None or business_hours.is_closed else sorted(
+            business_hours.time_periods_set.all(), key=lambda period: period.start_time)
+        for service in services:
+            slots[(service.id, date)] = build_day_slots(
+                date, periods, appointments_by_date.get(date, []), service.duration) if periods else []
+    return slots
+
+
+def check_and_send_reminders(batch_size=REMINDER_BATCH_SIZE):
+    started = monotonic()
     now = timezone.now()
     one_hour_from_now = now + timedelta(hours=1)
     today = now.date()
@@ -282,14 +337,45 @@ def check_and_send_reminders():
         status='confirmed',
         email_reminder_sent=False,
         start_time__gte=now.time(),
-        start_time__lte=one_hour_from_now.time()) 
-    logger.info(f"Checking reminders: Found {upcoming_appointments.count()} appointments needing reminders")
-    for appointment in upcoming_appointments:
-        try:
-            send_appointment_reminder(appointment)
-            logger.info(f"Reminder sent for appointment {appointment.id}")
-        except Exception as e:
-            logger.error(f"Failed to send reminder for appointment {appointment.id}: {str(e)}")
+        start_time__lte=one_hour_from_now.time()).select_related(
+            'client', 'business', 'service').order_by('pk')
+    sent_count = 0
+    failed_count = 0
+    last_pk = None
+    # Keyset pagination instead of a long-lived cursor: every chunk is one joined
+    # SELECT, and the UPDATE below never runs while a SELECT on the table is open.
+    while True:
+        chunk_queryset = upcoming_appointments
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:batch_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        sent_ids = []
+        for appointment in chunk:
+            try:
+                send_appointment_reminder(appointment, mark_sent=False)
+                sent_ids.append(appointment.pk)
+            except Exception as e:
+                failed_count += 1
+                logger.error(f"Failed to send reminder for appointment {appointment.id}: {str(e)}")
+        if sent_ids:
+            Appointment.objects.filter(pk__in=sent_ids).update(email_reminder_sent=True)
+            sent_count += len(sent_ids)
+        if len(chunk) < batch_size:
+            break
+    elapsed = monotonic() - started
+    processed = sent_count + failed_count
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    logger.info(
+        f"Reminders: sent {sent_count}, failed {failed_count} in {elapsed:.2f}s "
+        f"({rate:.1f} appointments/s)")
+    return {
+        'sent': sent_count,
+        'failed': failed_count,
+        'elapsed': elapsed,
+        'per_second': rate}
 
 
 def send_status_change_notification(appointment, old_status, new_status):
@@ -394,21 +480,24 @@ def send_appointment_cancellation_emails(appointment, cancelled_by='system'):
         except Exception as template_error:
             logger.warning(f"HTML template failed, sending simple email: {str(template_error)}")
             send_simple_cancellation_email_to_client(appointment, context)
-        business_subject = f'Appointment Cancelled - {context["client_name"]}'
-        try:
-            business_html_message = render_to_string('emails/appointment_cancellation_business.html', context)
-            business_plain_message = strip_tags(business_html_message)
-            send_mail(
-                subject=business_subject,
-                message=business_plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[appointment.business.owner.email],
-                html_message=business_html_message,
-                fail_silently=False)
-            logger.info(f"Business cancellation email sent to: {appointment.business.owner.email}")   
-        except Exception as template_error:
-            logger.warning(f"HTML template failed, sending simple email: {str(template_error)}")
-            send_simple_cancellation_email_to_business(appointment, context)
+        if appointment.business.owner.business_digest_enabled:
+            queue_owner_event(appointment, 'cancelled', cancelled_by=cancelled_by)
+        else:
+            business_subject = f'Appointment Cancelled - {context["client_name"]}'
+            try:
+                business_html_message = render_to_string('emails/appointment_cancellation_business.html', context)
+                business_plain_message = strip_tags(business_html_message)
+                send_mail(
+                    subject=business_subject,
+                    message=business_plain_message,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[appointment.business.owner.email],
+                    html_message=business_html_message,
+                    fail_silently=False)
+                logger.info(f"Business cancellation email sent to: {appointment.business.owner.email}")   
+            except Exception as template_error:
+                logger.warning(f"HTML template failed, sending simple email: {str(template_error)}")
+                send_simple_cancellation_email_to_business(appointment, context)
         logger.info("All appointment cancellation emails sent successfully!")
     except Exception as e:
         logger.error(f"Critical error in send_appointment_cancellation_emails: {str(e)}")
@@ -488,4 +577,76 @@ You can view your appointment calendar in your Business Dashboard.
         from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[appointment.business.owner.email],
         fail_silently=False)
-    logger.info(f"Fallback business cancellation email sent to: {appointment.business.owner.email}")
\ No newline at end of file
+    logger.info(f"Fallback business cancellation email sent to: {appointment.business.owner.email}")
+
+
+def queue_owner_event(appointment, event_type, cancelled_by=''):
+    OwnerNotificationEvent.objects.create(
+        owner_id=appointment.business.owner_id,
+        appointment=appointment,
+        event_type=event_type,
+        cancelled_by=cancelled_by if event_type == 'cancelled' else '')
+    logger.info(f"Queued '{event_type}' digest event for owner {appointment.business.owner.email}")
+
+
+def format_digest_line(event):
+    appointment = event.appointment
+    client_name = f"{appointment.client.first_name} {appointment.client.last_name}".strip() or appointment.client.username
+    when = f"{appointment.date.strftime('%a %d %b')} {appointment.start_time.strftime('%H:%M')} - {appointment.end_time.strftime('%H:%M')}"
+    if event.event_type == 'cancelled':
+        reason = f" (by {event.cancelled_by})" if event.cancelled_by else ''
+        return f"   ❌ Cancelled{reason}: {client_name} - {appointment.service.name} - {when}"
+    return f"   ✅ New: {client_name} - {appointment.service.name} - {when}"
+
+
+def send_owner_digest(owner, events):
+    booked_count = sum(1 for event in events if event.event_type == 'booked')
+    cancelled_count = len(events) - booked_count
+    message = f"""
+Hello {owner.first_name or owner.username},
+
+Here is your appointment digest: {booked_count} new, {cancelled_count} cancelled.
+"""
+    for business_name, business_events in groupby(events, key=lambda event: event.appointment.business.name):
+        message += f"\n🏢 {business_name}\n"
+        for event in business_events:
+            message += format_digest_line(event) + "\n"
+    message += """
+You can manage these appointments in your Business Dashboard.
+
+Have a great day!
+"""
+    send_mail(
+        subject=f'📋 Appointment digest - {booked_count} new, {cancelled_count} cancelled',
+        message=message.strip(),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[owner.email],
+        fail_silently=False)
+    logger.info(f"Digest with {len(events)} events sent to: {owner.email}")
+
+
+def send_owner_digests():
+    # One ordered, joined query; events are grouped per owner while streaming through it.
+    events = OwnerNotificationEvent.objects.select_related(
+        'owner', 'appointment__client', 'appointment__business', 'appointment__service').order_by(
+            'owner_id', 'appointment__business__name', 'created_at')
+    digests_sent = 0
+    failed_owners = 0
+    delivered_ids = []
+    for owner_id, owner_events in groupby(events.iterator(), key=lambda event: event.owner_id):
+        owner_events = list(owner_events)
+        try:
+            send_owner_digest(owner_events[0].owner, owner_events)
+            digests_sent += 1
+            delivered_ids.extend(event.pk for event in owner_events)
+        except Exception as e:
+            failed_owners += 1
+            logger.error(f"Failed to send digest to owner {owner_id}: {str(e)}")
+    for start in range(0, len(delivered_ids), DIGEST_DELETE_BATCH_SIZE):
+        OwnerNotificationEvent.objects.filter(
+            pk__in=delivered_ids[start:start + DIGEST_DELETE_BATCH_SIZE]).delete()
+    logger.info(f"Digests: sent {digests_sent}, failed {failed_owners}, {len(delivered_ids)} events delivered")
+    return {
+        'sent': digests_sent,
+        'failed': failed_owners,
+        'events': len(delivered_ids)}
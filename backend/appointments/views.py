@@ -1,16 +1,26 @@
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
 from .models import Appointment
 from .serializers import AppointmentSerializer
 from businesses.models import Business, Service
 from datetime import datetime, timedelta
 from django.db.models import Q
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework.views import APIView
+from appointment_system.throttling import TokenBucketThrottle
+from appointment_system.conditional import ConditionalGetMixin
+from appointment_system.cache import all_cache_stats, analytics_cache
 import logging
-from .utils import send_appointment_confirmation, generate_available_time_slots
+from .utils import send_appointment_confirmation
+from .availability import (
+    MAX_RANGE_DAYS, encode_availability, get_available_slots, get_available_slots_range, periods_by_weekday)
+from .importers import AppointmentImporter, iter_import_rows, guess_import_format, IMPORT_FORMATS
+import io
 
 # NEW ADDITION - FIX : 03/06/2025
 from django.contrib.auth import get_user_model
@@ -22,6 +32,8 @@ User = get_user_model()
 
 logger = logging.getLogger(__name__)
 
+WALKIN_USERNAME_ATTEMPTS = 5
+
 class IsAppointmentOwnerOrBusinessOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user.user_type == 'admin':
@@ -33,9 +45,11 @@ class IsAppointmentOwnerOrBusinessOwner(permissions.BasePermission):
         return False
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Nested business_details / service_details change without touching the appointment row
+    conditional_timestamp_fields = ('updated_at', 'business__snapshot__updated_at', 'service__updated_at')
     def get_queryset(self):
         user = self.request.user
         logger.info(f"Getting appointments for user: {user.username} (type: {user.user_type})")
@@ -95,24 +109,46 @@ class AppointmentViewSet(viewsets.ModelViewSet):
             except User.DoesNotExist:
                 pass
         base_username = f"walkin_{first_name}_{last_name}".lower().replace(' ', '_')
-        username = base_username
-        counter = 1
-        while User.objects.filter(username=username).exists():
-            username = f"{base_username}_{counter}"
-            counter += 1
         random_password = get_random_string(12)
-        walkin_client = User.objects.create_user(
-            username=username,
-            email=email if email else f"{username}@walkin.local",
-            first_name=first_name,
-            last_name=last_name,
-            phone_number=phone,
-            user_type='client',
-            password=random_password)
+        for attempt in range(WALKIN_USERNAME_ATTEMPTS):
+            username = self.next_walkin_username(base_username)
+            try:
+                with transaction.atomic():
+                    walkin_client = User.objects.create_user(
+                        username=username,
+                        email=email if email else f"{username}@walkin.local",
+                        first_name=first_name,
+                        last_name=last_name,
+                        phone_number=phone,
+                        user_type='client',
+                        password=random_password)
+                break
+            except IntegrityError:
+                # Another front desk took the same username (or email) in the meantime.
+                if email:
+                    existing_user = User.objects.filter(email=email).first()
+                    if existing_user:
+                        return existing_user
+                if attempt == WALKIN_USERNAME_ATTEMPTS - 1:
+                    raise
         print(f"Created new walk-in client: {walkin_client.username} ({walkin_client.email})")
         return walkin_client 
     
 
+    def next_walkin_username(self, base_username):
+        taken_suffixes = set()
+        for username in User.objects.filter(username__startswith=base_username).values_list('username', flat=True):
+            if username == base_username:
+                taken_suffixes.add(0)
+                continue
+            suffix = username[len(base_username):]
+            if suffix.startswith('_') and suffix[1:].isdigit():
+                taken_suffixes.add(int(suffix[1:]))
+        if 0 not in taken_suffixes:
+            return base_username
+        return f"{base_username}_{max(taken_suffixes) + 1}"
+    
+
     def check_permissions(self, request):
         super().check_permissions(request)
         if request.method == 'POST' and self.request.user.user_type not in ['client', 'business', 'admin']:
@@ -245,6 +281,45 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_appointments(self, request):
+        if request.user.user_type not in ['business', 'admin']:
+            return Response(
+                {"detail": "Only business owners can import appointments."},
+                status=status.HTTP_403_FORBIDDEN)
+        business_id = request.data.get('business_id')
+        upload = request.FILES.get('file')
+        if not business_id or not upload:
+            return Response(
+                {"detail": "business_id and file are required."},
+                status=status.HTTP_400_BAD_REQUEST)
+        businesses = Business.objects.all()
+        if request.user.user_type == 'business':
+            businesses = businesses.filter(owner=request.user)
+        try:
+            business = businesses.get(id=business_id)
+        except (Business.DoesNotExist, ValueError):
+            return Response(
+                {"detail": "Business not found or you don't own it."},
+                status=status.HTTP_404_NOT_FOUND)
+        max_size = getattr(settings, 'APPOINTMENT_IMPORT_MAX_UPLOAD_SIZE', 1024 * 1024)
+        if upload.size > max_size:
+            # Parsing and inserting runs in this request; big files would hold a worker for minutes
+            return Response(
+                {"detail": f"Files over {max_size // 1024} KB must be imported with the import_appointments command."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        import_format = request.data.get('format') or guess_import_format(upload.name)
+        if import_format not in IMPORT_FORMATS:
+            return Response(
+                {"detail": f"format must be one of: {', '.join(IMPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST)
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        # Rows that stop decoding are reported in the summary (earlier batches stay imported)
+        report = AppointmentImporter(business).run(iter_import_rows(stream, import_format))
+        logger.info(f"Import by {request.user.username} into business {business.id}: {report['appointments_created']} appointments")
+        return Response(report, status=status.HTTP_200_OK)
+
+
 class AppointmentAnalyticsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
@@ -252,34 +327,50 @@ class AppointmentAnalyticsView(APIView):
             return Response(
                 {"detail": "You don't have permission to access this resource."},
                 status=status.HTTP_403_FORBIDDEN)
-        appointments = Appointment.objects.all()
-        total_appointments = appointments.count()
-        pending_appointments = appointments.filter(status='pending').count()
-        confirmed_appointments = appointments.filter(status='confirmed').count()
-        cancelled_appointments = appointments.filter(status='cancelled').count()
-        completed_appointments = appointments.filter(status='completed').count()
-        User = get_user_model()
-        total_users = User.objects.count()
-        total_clients = User.objects.filter(user_type='client').count()
-        total_business_owners = User.objects.filter(user_type='business').count()
-        total_businesses = Business.objects.count()
-        recent_appointments = Appointment.objects.order_by('-created_at')[:5]
-        recent_appointments_data = AppointmentSerializer(recent_appointments, many=True).data
-        return Response({
-            'total_appointments': total_appointments,
-            'pending_appointments': pending_appointments,
-            'confirmed_appointments': confirmed_appointments,
-            'cancelled_appointments': cancelled_appointments,
-            'completed_appointments': completed_appointments,
-            'total_users': total_users,
-            'total_clients': total_clients,
-            'total_business_owners': total_business_owners,
-            'total_businesses': total_businesses,
-            'recent_appointments': recent_appointments_data})
+        return Response(analytics_cache.get_or_set('admin_summary', build_admin_summary))
+
+
+class CacheStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    def get(self, request):
+        if request.user.user_type != 'admin':
+            return Response(
+                {"detail": "You don't have permission to access this resource."},
+                status=status.HTTP_403_FORBIDDEN)
+        return Response({'namespaces': all_cache_stats()})
+
+
+def build_admin_summary():
+    appointments = Appointment.objects.all()
+    total_appointments = appointments.count()
+    pending_appointments = appointments.filter(status='pending').count()
+    confirmed_appointments = appointments.filter(status='confirmed').count()
+    cancelled_appointments = appointments.filter(status='cancelled').count()
+    completed_appointments = appointments.filter(status='completed').count()
+    User = get_user_model()
+    total_users = User.objects.count()
+    total_clients = User.objects.filter(user_type='client').count()
+    total_business_owners = User.objects.filter(user_type='business').count()
+    total_businesses = Business.objects.count()
+    recent_appointments = Appointment.objects.order_by('-created_at')[:5]
+    recent_appointments_data = AppointmentSerializer(recent_appointments, many=True).data
+    return {
+        'total_appointments': total_appointments,
+        'pending_appointments': pending_appointments,
+        'confirmed_appointments': confirmed_appointments,
+        'cancelled_appointments': cancelled_appointments,
+        'completed_appointments': completed_appointments,
+        'total_users': total_users,
+        'total_clients': total_clients,
+        'total_business_owners': total_business_owners,
+        'total_businesses': total_businesses,
+        'recent_appointments': recent_appointments_data}
 
 
 class AvailableTimeSlotsView(generics.GenericAPIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'available_slots'
     def get(self, request, *args, **kwargs):
         business_id = request.query_params.get('business_id')
         service_id = request.query_params.get('service_id')
@@ -299,10 +390,26 @@ class AvailableTimeSlotsView(generics.GenericAPIView):
             return Response(
                 {"detail": "Invalid business_id, service_id or date format."},
                 status=status.HTTP_400_BAD_REQUEST)
+        encoding = request.query_params.get('encoding', 'list')
+        try:
+            days = int(request.query_params.get('days', 1))
+        except ValueError:
+            days = 0
+        if encoding not in ('list', 'bitmap') or not 1 <= days <= MAX_RANGE_DAYS:
+            return Response(
+                {"detail": f"encoding must be 'list' or 'bitmap' and days between 1 and {MAX_RANGE_DAYS}."},
+                status=status.HTTP_400_BAD_REQUEST)
         try:
-            available_slots = generate_available_time_slots(business, service, date)
-            print(f"Generated {len(available_slots)} available slots")
-            return Response({"available_slots": available_slots})
+            if encoding == 'list' and days == 1:
+                available_slots = get_available_slots(business, service, date)
+                print(f"Generated {len(available_slots)} available slots")
+                return Response({"available_slots": available_slots})
+            dates = [date + timedelta(days=offset) for offset in range(days)]
+            slots_by_date = get_available_slots_range(business, service, dates)
+            if encoding == 'bitmap':
+                return Response(encode_availability(service, slots_by_date, periods_by_weekday(business)))
+            return Response({"days": [
+                {"date": day.isoformat(), "available_slots": slots_by_date[day]} for day in dates]})
         except Exception as e:
             print(f"Error generating slots: {e}")
             return Response(
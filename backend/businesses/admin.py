@@ -43,10 +43,7 @@ class BusinessCategoryAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     ordering = ('sort_order', 'name')
     list_editable = ('sort_order', 'is_active')
-    
-    def business_count(self, obj):
-        return obj.businesses.filter(is_active=True).count()
-    business_count.short_description = 'Active Businesses'
+    readonly_fields = ('business_count',)
 
 
 @admin.register(CategoryRequest)
@@ -0,0 +1,91 @@
+import json
+from math import ceil
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.http import HttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from appointment_system.conditional import conditional_validators, set_conditional_headers
+from appointment_system.fastpath import accepts_json, authenticated_user, delegate, fast_path
+from .models import Business
+from .snapshots import aget_snapshot_payloads
+from .views import BusinessViewSet
+
+LIST_PARAMS = {'category', 'page'}
+
+
+async def conditional_check(request, queryset, user):
+    # Same validators as BusinessViewSet's ConditionalGetMixin, so ETags work across both paths
+    aggregates = {f'latest_{index}': Max(field) for index, field in enumerate(BusinessViewSet.conditional_timestamp_fields)}
+    values = await queryset.order_by().aaggregate(row_count=Count('pk'), **aggregates)
+    user_id = user.pk if user.is_authenticated else 'anonymous'
+    etag, last_modified = conditional_validators(
+        request.get_full_path(), 'json', user_id, values['row_count'], [values[key] for key in aggregates])
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    return values['row_count'], etag, last_modified, get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def snapshot_response(body, etag, last_modified):
+    response = HttpResponse(body, content_type='application/json')
+    set_conditional_headers(response, etag, last_modified)
+    return response
+
+
+@fast_path
+async def business_list(request):
+    # BusinessViewSet.list for snapshot-backed JSON pages (same order_by('id') as its
+    # get_queryset, so pages match across paths); searches and other formats are delegated
+    if set(request.GET) - LIST_PARAMS or not accepts_json(request):
+        return await delegate(request)
+    user = await authenticated_user(request)
+    if user is None:
+        return await delegate(request)
+    queryset = Business.objects.filter(is_active=True)
+    category = request.GET.get('category')
+    if category:
+        queryset = queryset.filter(**{'category_id' if category.isdigit() else 'category__slug': category})
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page_number = int(request.GET.get('page', 1))
+    except ValueError:
+        return await delegate(request)
+    row_count, etag, last_modified, not_modified = await conditional_check(request, queryset, user)
+    if not_modified is not None:
+        set_conditional_headers(not_modified, etag, last_modified)
+        return not_modified
+    page_count = max(1, ceil(row_count / page_size))
+    if not 1 <= page_number <= page_count:
+        return await delegate(request)
+    offset = (page_number - 1) * page_size
+    business_ids = [business_id async for business_id in queryset.order_by('id').values_list('id', flat=True)[offset:offset + page_size]]
+    payloads = await aget_snapshot_payloads(business_ids)
+    results = '[' + ','.join(payloads[business_id] for business_id in business_ids if business_id in payloads) + ']'
+    url = request.build_absolute_uri()
+    next_link = replace_query_param(url, 'page', page_number + 1) if page_number < page_count else None
+    previous_link = None
+    if page_number > 1:
+        previous_link = remove_query_param(url, 'page') if page_number == 2 else replace_query_param(url, 'page', page_number - 1)
+    body = (
+        f'{{"count":{row_count},'
+        f'"next":{json.dumps(next_link)},'
+        f'"previous":{json.dumps(previous_link)},'
+        f'"results":{results}}}')
+    return snapshot_response(body, etag, last_modified)
+
+
+@fast_path
+async def business_detail(request, pk):
+    if request.GET or not accepts_json(request):
+        return await delegate(request)
+    user = await authenticated_user(request)
+    if user is None:
+        return await delegate(request)
+    row_count, etag, last_modified, not_modified = await conditional_check(
+        request, Business.objects.filter(is_active=True, pk=pk), user)
+    if not_modified is not None:
+        set_conditional_headers(not_modified, etag, last_modified)
+        return not_modified
+    payload = (await aget_snapshot_payloads([pk])).get(pk) if row_count else None
+    if payload is None:
+        return await delegate(request)
+    return snapshot_response(payload, etag, last_modified)
@@ -0,0 +1,225 @@
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from time import monotonic
+from django.conf import settings
+from django.db import connection
+from .models import Business, BusinessCategory, Service
+import logging
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 25
+AUTOCOMPLETE_SCAN_LIMIT = 200
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold().strip()
+
+
+def word_keys(label):
+    # Every word start is a key, so "Athens Hair Studio" matches "hair" and "stu"
+    words = normalize(label).split()
+    return {' '.join(words[position:]) for position in range(len(words))}
+
+
+class PrefixIndex:
+    """
+    Sorted array of (key, kind, id) tuples over active business, service and
+    category names. Lookups are a bisect plus a short forward scan; saves update
+    it incrementally. The first lookup builds it (concurrent lookups wait for
+    that one build); afterwards it is rebuilt in a background thread every
+    AUTOCOMPLETE_REFRESH_INTERVAL seconds so other processes' edits show up,
+    while lookups keep reading the previous arrays until the new ones are
+    swapped in.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+        self.entries = []
+        self.items = {}
+        self.services_by_business = defaultdict(set)
+        self.built_at = None
+        self.refreshing = False
+        # Incremental updates made while a rebuild reads the database, replayed after the swap
+        self.replay = None
+
+    def is_stale(self):
+        interval = getattr(settings, 'AUTOCOMPLETE_REFRESH_INTERVAL', 300)
+        return self.built_at is None or monotonic() - self.built_at > interval
+
+    def ensure_built(self):
+        if self.built_at is None:
+            with self.build_lock:
+                if self.built_at is None:
+                    self.rebuild()
+        elif self.is_stale():
+            self.refresh_in_background()
+
+    def refresh_in_background(self):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+        threading.Thread(target=self.background_rebuild, name='autocomplete-rebuild', daemon=True).start()
+
+    def background_rebuild(self):
+        try:
+            with self.build_lock:
+                self.rebuild()
+        except Exception as e:
+            logger.error(f"Autocomplete index rebuild failed: {str(e)}")
+        finally:
+            with self.lock:
+                self.refreshing = False
+            # The thread got its own database connection
+            connection.close()
+
+    def rebuild(self):
+        started = monotonic()
+        with self.lock:
+            self.replay = []
+        try:
+            items = {}
+            for category_id, name in BusinessCategory.objects.filter(is_active=True).values_list('id', 'name'):
+                items[('category', category_id)] = {'type': 'category', 'id': category_id, 'label': name}
+            for business_id, name in Business.objects.filter(is_active=True).values_list('id', 'name'):
+                items[('business', business_id)] = {'type': 'business', 'id': business_id, 'label': name}
+            services = Service.objects.filter(
+                is_active=True, business__is_active=True).values_list('id', 'name', 'business_id', 'business__name')
+            for service_id, name, business_id, business_name in services:
+                items[('service', service_id)] = {
+                    'type': 'service', 'id': service_id, 'label': name,
+                    'business_id': business_id, 'business_name': business_name}
+            entries = []
+            services_by_business = defaultdict(set)
+            for (kind, object_id), item in items.items():
+                keys = word_keys(item['label'])
+                item['_length'] = max(map(len, keys), default=0)
+                entries.extend((key, kind, object_id) for key in keys)
+                if kind == 'service':
+                    services_by_business[item['business_id']].add(object_id)
+            entries.sort()
+        except Exception:
+            with self.lock:
+                self.replay = None
+            raise
+        with self.lock:
+            replay, self.replay = self.replay, None
+            self.entries = entries
+            self.items = items
+            self.services_by_business = services_by_business
+            self.built_at = monotonic()
+            for operation, args in replay:
+                operation(*args)
+        logger.info(f"Autocomplete index built: {len(items)} names, {len(entries)} keys in {monotonic() - started:.3f}s")
+
+    def add(self, kind, object_id, item):
+        with self.lock:
+            if self.replay is not None:
+                self.replay.append((self.add, (kind, object_id, item)))
+            self.discard(kind, object_id)
+            keys = word_keys(item['label'])
+            item['_length'] = max(map(len, keys), default=0)
+            self.items[(kind, object_id)] = item
+            if kind == 'service':
+                self.services_by_business[item['business_id']].add(object_id)
+            for key in keys:
+                insort(self.entries, (key, kind, object_id))
+
+    def remove(self, kind, object_id):
+        with self.lock:
+            if self.replay is not None:
+                self.replay.append((self.remove, (kind, object_id)))
+            self.discard(kind, object_id)
+
+    def discard(self, kind, object_id):
+        with self.lock:
+            item = self.items.pop((kind, object_id), None)
+            if not item:
+                return
+            if kind == 'service':
+                self.services_by_business[item['business_id']].discard(object_id)
+                if not self.services_by_business[item['business_id']]:
+                    del self.services_by_business[item['business_id']]
+            for key in word_keys(item['label']):
+                position = bisect_left(self.entries, (key, kind, object_id))
+                if position < len(self.entries) and self.entries[position] == (key, kind, object_id):
+                    del self.entries[position]
+
+    def lookup(self, query, limit=AUTOCOMPLETE_LIMIT, kinds=None):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self.ensure_built()
+        matches = {}
+        with self.lock:
+            position = bisect_left(self.entries, (prefix,))
+            end = min(len(self.entries), position + AUTOCOMPLETE_SCAN_LIMIT)
+            while position < end:
+                key, kind, object_id = self.entries[position]
+                if not key.startswith(prefix):
+                    break
+                position += 1
+                if kinds and kind not in kinds:
+                    continue
+                item = self.items[(kind, object_id)]
+                # Names that start with the prefix rank above mid-name word matches;
+                # the longest key for a name is the whole name
+                rank = (len(key) < item['_length'], len(item['label']), item['label'])
+                if (kind, object_id) not in matches or rank < matches[(kind, object_id)][0]:
+                    matches[(kind, object_id)] = (rank, item)
+        ranked = sorted(matches.values(), key=lambda match: match[0])[:limit]
+        return [{field: value for field, value in item.items() if field != '_length'} for rank, item in ranked]
+
+    # Incremental updates from signals; skipped until the first lookup builds the index
+    def sync_category(self, category, deleted=False):
+        if self.built_at is None:
+            return
+        if deleted or not category.is_active:
+            self.remove('category', category.id)
+        else:
+            self.add('category', category.id, {'type': 'category', 'id': category.id, 'label': category.name})
+
+    def sync_business(self, business, deleted=False):
+        if self.built_at is None:
+            return
+        with self.lock:
+            service_ids = list(self.services_by_business.get(business.id, ()))
+            if deleted or not business.is_active:
+                self.remove('business', business.id)
+                for service_id in service_ids:
+                    self.remove('service', service_id)
+                return
+            was_indexed = ('business', business.id) in self.items
+            self.add('business', business.id, {'type': 'business', 'id': business.id, 'label': business.name})
+            if was_indexed:
+                # Services already indexed only carry the business name
+                for service_id in service_ids:
+                    item = self.items[('service', service_id)]
+                    if item['business_name'] != business.name:
+                        self.add('service', service_id, {**item, 'business_name': business.name})
+                return
+        # A business (re)activated since the last build: its services were never indexed
+        for service in Service.objects.filter(business=business, is_active=True):
+            self.sync_service(service, business=business)
+
+    def sync_service(self, service, deleted=False, business=None):
+        if self.built_at is None:
+            return
+        if deleted or not service.is_active:
+            return self.remove('service', service.id)
+        business = business or service.business
+        if not business.is_active:
+            self.remove('service', service.id)
+        else:
+            self.add('service', service.id, {
+                'type': 'service', 'id': service.id, 'label': service.name,
+                'business_id': business.id, 'business_name': business.name})
+
+
+autocomplete_index = PrefixIndex()
@@ -0,0 +1,68 @@
+from django.db.models import Case, CharField, Count, Q, Value, When
+from .models import Business, Service
+
+# (key, label, lower bound inclusive, upper bound exclusive)
+PRICE_BANDS = (
+    ('under_20', 'Under €20', None, 20),
+    ('20_50', '€20 - €50', 20, 50),
+    ('50_100', '€50 - €100', 50, 100),
+    ('100_plus', '€100+', 100, None))
+
+DURATION_BANDS = (
+    ('under_30', 'Under 30 min', None, 30),
+    ('30_60', '30 - 60 min', 30, 60),
+    ('60_120', '1 - 2 hours', 60, 120),
+    ('120_plus', '2 hours+', 120, None))
+
+
+def band_condition(field, lower, upper):
+    condition = Q()
+    if lower is not None:
+        condition &= Q(**{f'{field}__gte': lower})
+    if upper is not None:
+        condition &= Q(**{f'{field}__lt': upper})
+    return condition
+
+
+def band_case(field, bands):
+    return Case(
+        *[When(band_condition(field, lower, upper), then=Value(key)) for key, label, lower, upper in bands],
+        default=Value(None),
+        output_field=CharField())
+
+
+def filter_by_bands(queryset, price_band=None, duration_band=None):
+    # A business matches when one active service falls inside every requested band
+    prices = {key: (lower, upper) for key, label, lower, upper in PRICE_BANDS}
+    durations = {key: (lower, upper) for key, label, lower, upper in DURATION_BANDS}
+    condition = Q(is_active=True)
+    if price_band in prices:
+        condition &= band_condition('price', *prices[price_band])
+    if duration_band in durations:
+        condition &= band_condition('duration', *durations[duration_band])
+    if price_band in prices or duration_band in durations:
+        queryset = queryset.filter(id__in=Service.objects.filter(condition).values('business_id'))
+    return queryset
+
+
+def band_counts(services, field, bands):
+    # Distinct businesses per band, grouped in SQL
+    counts = dict(services.annotate(band=band_case(field, bands)).values('band').annotate(
+        count=Count('business_id', distinct=True)).values_list('band', 'count'))
+    return [{'band': key, 'label': label, 'count': counts.get(key, 0)} for key, label, lower, upper in bands]
+
+
+def compute_facets(queryset):
+    # Three grouped COUNT(DISTINCT) queries over the matching businesses; only
+    # one row per facet value leaves the database
+    business_ids = queryset.order_by().values('id')
+    categories = Business.objects.filter(id__in=business_ids, category__isnull=False).values(
+        'category_id', 'category__name', 'category__slug').annotate(
+        count=Count('id', distinct=True)).order_by('-count', 'category__name')
+    services = Service.objects.filter(business_id__in=business_ids, is_active=True).order_by()
+    return {
+        'categories': [
+            {'id': row['category_id'], 'name': row['category__name'], 'slug': row['category__slug'], 'count': row['count']}
+            for row in categories],
+        'price_bands': band_counts(services, 'price', PRICE_BANDS),
+        'duration_bands': band_counts(services, 'duration', DURATION_BANDS)}
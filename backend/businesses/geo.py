@@ -0,0 +1,121 @@
+import csv
+import math
+import os
+import unicodedata
+from functools import lru_cache
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.csv')
+# Sorts after every geohash character, so [cell, cell + '{') is the prefix range
+GEOHASH_RANGE_END = '{'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            middle = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= middle:
+                bits = (bits << 1) | 1
+                lng_range[0] = middle
+            else:
+                bits = bits << 1
+                lng_range[1] = middle
+        else:
+            middle = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= middle:
+                bits = (bits << 1) | 1
+                lat_range[0] = middle
+            else:
+                bits = bits << 1
+                lat_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def cell_size_degrees(precision):
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def cell_coverage_km(precision, latitude):
+    # Radius guaranteed to be inside the 3x3 block of cells around a point
+    lat_degrees, lng_degrees = cell_size_degrees(precision)
+    km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+    return min(lat_degrees * km_per_degree, lng_degrees * km_per_degree * math.cos(math.radians(latitude)))
+
+
+def precision_for_radius(radius_km, latitude):
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        if cell_coverage_km(precision, latitude) >= radius_km:
+            return precision
+    return 1
+
+
+def neighborhood_cells(latitude, longitude, precision):
+    lat_degrees, lng_degrees = cell_size_degrees(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        cell_latitude = latitude + lat_step * lat_degrees
+        if not -90 <= cell_latitude <= 90:
+            continue
+        for lng_step in (-1, 0, 1):
+            cell_longitude = (longitude + lng_step * lng_degrees + 180) % 360 - 180
+            cells.add(encode_geohash(cell_latitude, cell_longitude, precision))
+    return sorted(cells)
+
+
+def haversine_km(latitude1, longitude1, latitude2, longitude2):
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    delta_phi = math.radians(latitude2 - latitude1)
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def normalize_place(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return ' '.join(''.join(char if char.isalnum() else ' ' for char in stripped).split())
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer():
+    places = {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as gazetteer_file:
+        for row in csv.DictReader(gazetteer_file):
+            coordinates = (float(row['latitude']), float(row['longitude']))
+            names = [row['name']] + [alias for alias in (row.get('aliases') or '').split('|') if alias]
+            for name in names:
+                places[normalize_place(name)] = coordinates
+    return places
+
+
+def geocode_address(address):
+    # Addresses run from specific to general, so the earliest whole-word match
+    # wins: "Kolonaki, Athens" resolves to Kolonaki rather than Athens
+    words = normalize_place(address).split()
+    if not words:
+        return None
+    places = load_gazetteer()
+    longest = max(len(name.split()) for name in places)
+    for start in range(len(words)):
+        for length in range(min(longest, len(words) - start), 0, -1):
+            coordinates = places.get(' '.join(words[start:start + length]))
+            if coordinates:
+                return coordinates
+    return None
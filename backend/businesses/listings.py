@@ -0,0 +1,48 @@
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
+from .models import Business, BusinessCategory, BusinessHours
+from .serializers import BusinessSerializer, BusinessCategorySerializer
+from appointment_system.cache import listings_cache
+
+BY_CATEGORY_LIMIT = 6
+FEATURED_CATEGORY_LIMIT = 8
+
+
+def invalidate_listings():
+    listings_cache.invalidate_on_commit()
+
+
+def top_businesses_per_category(categories, per_category):
+    # One windowed query ranks active businesses inside each category; the nested
+    # serializer data (owner, category, hours, periods, services) is prefetched
+    ranked = Business.objects.filter(is_active=True, category__in=categories).annotate(
+        category_rank=Window(RowNumber(), partition_by=F('category_id'), order_by=F('id').asc()),
+    ).filter(category_rank__lte=per_category).order_by('category_id', 'category_rank')
+    ranked = ranked.select_related('owner', 'category').prefetch_related(
+        Prefetch('business_hours', queryset=BusinessHours.objects.prefetch_related('time_periods_set')),
+        'services')
+    grouped = {}
+    for business in ranked:
+        grouped.setdefault(business.category_id, []).append(business)
+    return grouped
+
+
+def cached_listing(name, request, build):
+    # logo_url is absolute, so the host is part of the key
+    return listings_cache.get_or_set(f"{name}:{request.scheme}://{request.get_host()}", lambda: build(request))
+
+
+def build_by_category(request):
+    categories = list(BusinessCategory.objects.filter(is_active=True).order_by('sort_order', 'name'))
+    grouped = top_businesses_per_category(categories, BY_CATEGORY_LIMIT)
+    return [
+        {'category': BusinessCategorySerializer(category).data,
+         'businesses': BusinessSerializer(grouped[category.id], many=True, context={'request': request}).data}
+        for category in categories if grouped.get(category.id)]
+
+
+def build_featured(request):
+    categories = list(BusinessCategory.objects.filter(is_active=True).order_by('sort_order', 'name')[:FEATURED_CATEGORY_LIMIT])
+    grouped = top_businesses_per_category(categories, 1)
+    featured_businesses = [grouped[category.id][0] for category in categories if grouped.get(category.id)]
+    return BusinessSerializer(featured_businesses, many=True, context={'request': request}).data
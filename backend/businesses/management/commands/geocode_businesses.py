@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from businesses.utils import geocode_businesses, GEOCODE_BATCH_SIZE
+
+class Command(BaseCommand):
+    help = 'Fill business coordinates and geohashes from the local gazetteer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-geocode every business, not only those without coordinates')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=GEOCODE_BATCH_SIZE,
+            help='Businesses updated per query')
+
+    def handle(self, *args, **options):
+        result = geocode_businesses(only_missing=not options['all'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Geocoded {result['located']} businesses ({result['unresolved']} addresses not in the gazetteer)"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand, CommandError
+from businesses.search import create_search_index, get_search_backend
+
+class Command(BaseCommand):
+    help = 'Create the business full-text search index if needed and repopulate it from the database'
+
+    def handle(self, *args, **options):
+        if get_search_backend() is None:
+            raise CommandError('Full-text search is only supported on SQLite and PostgreSQL')
+        self.stdout.write('Rebuilding business search index...')
+        indexed = create_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} businesses"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from businesses.snapshots import rebuild_snapshots, SNAPSHOT_BATCH_SIZE
+
+class Command(BaseCommand):
+    help = 'Render the pre-built JSON snapshots served by the public business endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help='Only render missing or stale snapshots')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SNAPSHOT_BATCH_SIZE,
+            help='Businesses loaded and rendered per batch')
+
+    def handle(self, *args, **options):
+        rendered = rebuild_snapshots(batch_size=options['batch_size'], only_stale=options['stale_only'])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} business snapshots"))
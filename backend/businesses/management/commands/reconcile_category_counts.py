@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from businesses.utils import reconcile_category_counts
+
+class Command(BaseCommand):
+    help = 'Recount active businesses per category and fix any drifted business_count values'
+
+    def handle(self, *args, **options):
+        result = reconcile_category_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result['checked']} categories, fixed {result['fixed']}"))
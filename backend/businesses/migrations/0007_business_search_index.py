@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:12
+
+from django.db import migrations
+
+# The search index as it stood at this migration, frozen here rather than read from
+# businesses.search so later changes to that module cannot alter this step.
+# Backends without full-text search get no table; search falls back to icontains.
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS businesses_search USING fts5("
+        "name, description, address, category, tokenize='unicode61 remove_diacritics 2')",
+        "INSERT INTO businesses_search (rowid, name, description, address, category) "
+        "SELECT b.id, b.name, COALESCE(b.description, ''), COALESCE(b.address, ''), COALESCE(c.name, '') "
+        "FROM businesses_business b LEFT JOIN businesses_businesscategory c ON c.id = b.category_id",
+    ],
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS businesses_search ("
+        "business_id bigint PRIMARY KEY, document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS businesses_search_document_idx ON businesses_search USING GIN (document)",
+        "INSERT INTO businesses_search (business_id, document) "
+        "SELECT b.id, "
+        "setweight(to_tsvector('simple', b.name), 'A') || "
+        "setweight(to_tsvector('simple', COALESCE(b.description, '')), 'C') || "
+        "setweight(to_tsvector('simple', COALESCE(b.address, '')), 'D') || "
+        "setweight(to_tsvector('simple', COALESCE(c.name, '')), 'B') "
+        "FROM businesses_business b LEFT JOIN businesses_businesscategory c ON c.id = b.category_id "
+        "ON CONFLICT (business_id) DO NOTHING",
+    ],
+}
+
+DROP_SQL = {
+    'sqlite': ["DROP TABLE IF EXISTS businesses_search"],
+    'postgresql': ["DROP TABLE IF EXISTS businesses_search"],
+}
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0006_categoryrequest_business_category_request'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_vendor_sql(CREATE_SQL), run_vendor_sql(DROP_SQL)),
+    ]
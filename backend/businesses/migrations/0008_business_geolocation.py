@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:59
+
+from django.db import migrations, models
+
+
+def geocode_existing_businesses(apps, schema_editor):
+    from businesses.geo import encode_geohash, geocode_address
+    Business = apps.get_model('businesses', 'Business')
+    located = []
+    for business in Business.objects.exclude(address__isnull=True).exclude(address='').only('id', 'address'):
+        coordinates = geocode_address(business.address)
+        if coordinates:
+            business.latitude, business.longitude = coordinates
+            business.geohash = encode_geohash(*coordinates)
+            located.append(business)
+    Business.objects.bulk_update(located, ['latitude', 'longitude', 'geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0007_business_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(geocode_existing_businesses, migrations.RunPython.noop),
+    ]
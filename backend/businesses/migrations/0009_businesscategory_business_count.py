@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:01
+
+from django.db import migrations, models
+
+
+def count_active_businesses(apps, schema_editor):
+    BusinessCategory = apps.get_model('businesses', 'BusinessCategory')
+    categories = BusinessCategory.objects.annotate(
+        actual_count=models.Count('businesses', filter=models.Q(businesses__is_active=True)))
+    for category in categories:
+        category.business_count = category.actual_count
+    BusinessCategory.objects.bulk_update(categories, ['business_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0008_business_geolocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businesscategory',
+            name='business_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Active businesses in this category, maintained by Business.save/delete', verbose_name='Active Businesses'),
+        ),
+        migrations.RunPython(count_active_businesses, migrations.RunPython.noop),
+    ]
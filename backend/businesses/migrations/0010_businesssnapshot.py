@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_stale_snapshots(apps, schema_editor):
+    # Payloads are rendered lazily on first read (or by rebuild_snapshots)
+    Business = apps.get_model('businesses', 'Business')
+    BusinessSnapshot = apps.get_model('businesses', 'BusinessSnapshot')
+    BusinessSnapshot.objects.bulk_create(
+        [BusinessSnapshot(business_id=business_id) for business_id in Business.objects.values_list('id', flat=True)],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0009_businesscategory_business_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessSnapshot',
+            fields=[
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='businesses.business')),
+                ('payload', models.TextField(blank=True, default='')),
+                ('is_stale', models.BooleanField(default=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_stale_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+def mark_snapshots_stale(apps, schema_editor):
+    # Stored payloads embed owner_details, which no longer includes business_digest_enabled
+    BusinessSnapshot = apps.get_model('businesses', 'BusinessSnapshot')
+    BusinessSnapshot.objects.update(is_stale=True, version=models.F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0010_businesssnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_snapshots_stale, migrations.RunPython.noop),
+    ]
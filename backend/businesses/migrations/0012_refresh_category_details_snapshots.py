@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+def mark_snapshots_stale(apps, schema_editor):
+    # Stored payloads embed category_details, which no longer includes business_count
+    BusinessSnapshot = apps.get_model('businesses', 'BusinessSnapshot')
+    BusinessSnapshot.objects.update(is_stale=True, version=models.F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0011_refresh_owner_details_snapshots'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_snapshots_stale, migrations.RunPython.noop),
+    ]
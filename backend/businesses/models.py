@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from accounts.models import User
+from appointment_system.cache import categories_cache, snapshots_cache
+from .geo import encode_geohash, geocode_address
 
 
 class BusinessCategory(models.Model):
@@ -17,6 +20,11 @@ class BusinessCategory(models.Model):
     is_active = models.BooleanField(default=True)
     is_default = models.BooleanField(default=False, help_text="Default categories that can't be deleted")
     sort_order = models.PositiveIntegerField(default=0)
+    business_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Active Businesses',
+        help_text="Active businesses in this category, maintained by Business.save/delete")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -27,10 +35,24 @@ class BusinessCategory(models.Model):
     
     def __str__(self):
         return self.name
-    
-    @property
-    def business_count(self):
-        return self.businesses.filter(is_active=True).count()
+
+    def save(self, *args, **kwargs):
+        # business_count is only written through adjust_business_count, so saving
+        # a category edit never overwrites a concurrent increment
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'business_count']
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def adjust_business_count(cls, category_id, delta):
+        if category_id is None or not delta:
+            return
+        cls.objects.filter(pk=category_id).update(
+            business_count=models.F('business_count') + delta,
+            updated_at=timezone.now())
+        categories_cache.invalidate_on_commit()
 
 
 class CategoryRequest(models.Model):
@@ -107,6 +129,9 @@ class Business(models.Model):
     phone = models.CharField(max_length=15, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
     logo = models.ImageField(upload_to='business_logos/', blank=True, null=True)
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    geohash = models.CharField(max_length=12, blank=True, null=True, db_index=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -114,6 +139,48 @@ class Business(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_address = instance.__dict__.get('address')
+        instance._loaded_counted_category = instance.counted_category()
+        return instance
+
+    def counted_category(self):
+        # Category this business adds to business_count, None if inactive or uncategorized;
+        # False when the fields were deferred and the stored values are unknown
+        if 'category_id' not in self.__dict__ or 'is_active' not in self.__dict__:
+            return False
+        return self.category_id if self.is_active else None
+
+    def geocode(self):
+        coordinates = geocode_address(self.address)
+        if coordinates:
+            self.latitude, self.longitude = coordinates
+        else:
+            self.latitude = self.longitude = None
+        self.geohash = encode_geohash(self.latitude, self.longitude) if coordinates else None
+
+    def save(self, *args, **kwargs):
+        address_changed = self.address != getattr(self, '_loaded_address', None)
+        if address_changed or (self.address and self.latitude is None):
+            self.geocode()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'latitude', 'longitude', 'geohash'}
+        previous = None if self._state.adding else getattr(self, '_loaded_counted_category', False)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'category', 'category_id', 'is_active'} & set(update_fields):
+            previous = False
+        current = self.counted_category()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous is not False and current is not False and previous != current:
+                BusinessCategory.adjust_business_count(previous, -1)
+                BusinessCategory.adjust_business_count(current, 1)
+        self._loaded_address = self.address
+        if previous is not False and current is not False:
+            self._loaded_counted_category = current
+
 
 class BusinessHours(models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='business_hours')
@@ -182,4 +249,34 @@ class Service(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f"{self.name} - {self.business.name}"
\ No newline at end of file
+        return f"{self.name} - {self.business.name}"
+
+
+class BusinessSnapshot(models.Model):
+    """
+    Pre-rendered BusinessSerializer JSON for the public list/detail endpoints.
+    Writes that change the payload mark it stale (bumping version); readers
+    regenerate stale snapshots and only store them if version is unchanged.
+    """
+    business = models.OneToOneField(Business, on_delete=models.CASCADE, primary_key=True, related_name='snapshot')
+    payload = models.TextField(blank=True, default='')
+    is_stale = models.BooleanField(default=True)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Snapshot of business {self.business_id}{' (stale)' if self.is_stale else ''}"
+
+    @classmethod
+    def mark_stale(cls, **filters):
+        # Only the affected businesses' cached payloads are dropped (one cache scope each);
+        # list pages are assembled from per-business payloads, so nothing else depends on them
+        business_ids = list(cls.objects.filter(**filters).values_list('business_id', flat=True))
+        if not business_ids:
+            return 0
+        marked = cls.objects.filter(business_id__in=business_ids).update(
+            is_stale=True,
+            version=models.F('version') + 1,
+            updated_at=timezone.now())
+        snapshots_cache.invalidate_scopes_on_commit(business_ids)
+        return marked
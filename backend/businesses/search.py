@@ -0,0 +1,224 @@
+import re
+from django.db import connection as default_connection
+from django.db.models.expressions import RawSQL
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'businesses_search'
+INDEX_CHUNK_SIZE = 500
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Reads every business with its category name; shared by rebuild() on all backends
+SOURCE_SQL = (
+    "SELECT b.id, b.name, COALESCE(b.description, ''), COALESCE(b.address, ''), COALESCE(c.name, '') "
+    "FROM businesses_business b LEFT JOIN businesses_businesscategory c ON c.id = b.category_id")
+
+
+def search_tokens(query):
+    return TOKEN_PATTERN.findall(query.lower())[:10]
+
+
+class BaseSearchBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def is_available(self):
+        return SEARCH_TABLE in self.connection.introspection.table_names()
+
+    def create_index(self):
+        raise NotImplementedError
+
+    def drop_index(self):
+        raise NotImplementedError
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(SOURCE_SQL)
+            rows = cursor.fetchall()
+        for start in range(0, len(rows), INDEX_CHUNK_SIZE):
+            self.write_rows(rows[start:start + INDEX_CHUNK_SIZE])
+        return len(rows)
+
+    def index_businesses(self, business_ids):
+        business_ids = list(business_ids)
+        if not business_ids:
+            return
+        for start in range(0, len(business_ids), INDEX_CHUNK_SIZE):
+            chunk = business_ids[start:start + INDEX_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"{SOURCE_SQL} WHERE b.id IN ({placeholders})", chunk)
+                rows = cursor.fetchall()
+            self.remove_businesses(chunk)
+            self.write_rows(rows)
+
+    def remove_businesses(self, business_ids):
+        raise NotImplementedError
+
+    def write_rows(self, rows):
+        raise NotImplementedError
+
+    def match_expression(self, query):
+        raise NotImplementedError
+
+    def filter_queryset(self, queryset, query):
+        """
+        Restricts queryset to businesses matching query and orders them by
+        relevance, in the same SQL as the queryset's own filters (so counts and
+        pagination cover every match). Returns None when the query has no
+        word tokens.
+        """
+        match = self.match_expression(query)
+        if match is None:
+            return None
+        table = queryset.model._meta.db_table
+        return queryset.filter(id__in=RawSQL(self.match_sql, [match])).annotate(
+            search_rank=RawSQL(self.rank_sql.format(table=table), [match]),
+        ).order_by('search_rank', 'id')
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    # FTS5 table whose rowid is the business id; bm25 weights favour name, then category
+    match_sql = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+    # bm25 is lower for better matches
+    rank_sql = (
+        f"SELECT bm25({SEARCH_TABLE}, 10.0, 2.0, 1.0, 5.0) FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND rowid = {{table}}.id")
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "name, description, address, category, tokenize='unicode61 remove_diacritics 2')")
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def remove_businesses(self, business_ids):
+        business_ids = list(business_ids)
+        if not business_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(business_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", business_ids)
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, address, category) "
+                "VALUES (%s, %s, %s, %s, %s)", rows)
+
+    def match_expression(self, query):
+        tokens = search_tokens(query)
+        return ' '.join(f'"{token}"*' for token in tokens) if tokens else None
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    # One weighted tsvector per business behind a GIN index
+    document_sql = (
+        "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'C') || "
+        "setweight(to_tsvector('simple', %s), 'D') || setweight(to_tsvector('simple', %s), 'B')")
+    match_sql = f"SELECT business_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', %s)"
+    # Negated so that, as with bm25, lower sorts first
+    rank_sql = (
+        f"SELECT -ts_rank(document, to_tsquery('simple', %s)) FROM {SEARCH_TABLE} "
+        f"WHERE business_id = {{table}}.id")
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                "business_id bigint PRIMARY KEY, document tsvector NOT NULL)")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)")
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def remove_businesses(self, business_ids):
+        business_ids = list(business_ids)
+        if not business_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE business_id = ANY(%s)", [business_ids])
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (business_id, document) VALUES (%s, {self.document_sql}) "
+                "ON CONFLICT (business_id) DO UPDATE SET document = EXCLUDED.document", rows)
+
+    def match_expression(self, query):
+        tokens = search_tokens(query)
+        return ' & '.join(f"{token}:*" for token in tokens) if tokens else None
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend}
+
+_availability = {}
+
+
+def get_search_backend(connection=None):
+    connection = connection or default_connection
+    backend_class = SEARCH_BACKENDS.get(connection.vendor)
+    return backend_class(connection) if backend_class else None
+
+
+def create_search_index(connection=None, populate=True):
+    backend = get_search_backend(connection)
+    if backend is None:
+        return 0
+    backend.create_index()
+    _availability.pop(backend.connection.alias, None)
+    return backend.rebuild() if populate else 0
+
+
+def drop_search_index(connection=None):
+    backend = get_search_backend(connection)
+    if backend is None:
+        return
+    backend.drop_index()
+    _availability.pop(backend.connection.alias, None)
+
+
+def get_active_search_backend():
+    # Returns None (callers fall back to icontains) when the index table is missing
+    backend = get_search_backend()
+    if backend is None:
+        return None
+    alias = backend.connection.alias
+    if alias not in _availability:
+        _availability[alias] = backend.is_available()
+        if not _availability[alias]:
+            logger.warning(f"Search index table '{SEARCH_TABLE}' missing on '{alias}', falling back to icontains")
+    return backend if _availability[alias] else None
+
+
+def search_businesses(queryset, query):
+    # Ranked full-text matches within queryset, or None to fall back to icontains
+    backend = get_active_search_backend()
+    if backend is None:
+        return None
+    return backend.filter_queryset(queryset, query)
+
+
+def index_businesses(business_ids):
+    backend = get_active_search_backend()
+    if backend is not None:
+        backend.index_businesses(business_ids)
+
+
+def remove_businesses(business_ids):
+    backend = get_active_search_backend()
+    if backend is not None:
+        backend.remove_businesses(business_ids)
@@ -66,6 +66,13 @@ class BusinessCategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'icon_class', 'color', 'business_count']
 
 
+class NestedBusinessCategorySerializer(BusinessCategorySerializer):
+    # category_details of a business: no business_count, so a counter change does not
+    # make every business snapshot in the category stale
+    class Meta(BusinessCategorySerializer.Meta):
+        fields = ['id', 'name', 'slug', 'description', 'icon_class', 'color']
+
+
 class CategoryRequestSerializer(serializers.ModelSerializer):
     requested_by_details = UserProfileSerializer(source='requested_by', read_only=True)
     created_category_details = BusinessCategorySerializer(source='created_category', read_only=True)
@@ -136,7 +143,7 @@ class BusinessSerializer(serializers.ModelSerializer):
     business_hours = BusinessHoursSerializer(many=True, read_only=True)
     services = ServiceSerializer(many=True, read_only=True)
     logo_url = serializers.SerializerMethodField()
-    category_details = BusinessCategorySerializer(source='category', read_only=True)
+    category_details = NestedBusinessCategorySerializer(source='category', read_only=True)
     category_name = serializers.ReadOnlyField(source='category.name')
     category_icon = serializers.ReadOnlyField(source='category.icon_class')
     category_color = serializers.ReadOnlyField(source='category.color')
@@ -147,10 +154,10 @@ class BusinessSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'address', 'phone', 'email', 'logo', 
             'logo_url', 'owner', 'owner_details', 'business_hours', 'services',
             'category', 'category_details', 'category_name', 'category_icon', 'category_color',
-            'is_active', 'created_at']
+            'latitude', 'longitude', 'is_active', 'created_at']
         read_only_fields = ['owner_details', 'business_hours', 'services', 'logo_url', 'owner', 
                            'category_details', 'category_name', 'category_icon', 'category_color',
-            'is_active', 'created_at']
+            'latitude', 'longitude', 'is_active', 'created_at']
         
 
     def get_logo_url(self, obj):
@@ -158,6 +165,9 @@ class BusinessSerializer(serializers.ModelSerializer):
             request = self.context.get('request')
             if request:
                 return request.build_absolute_uri(obj.logo.url)
+            base_url = self.context.get('base_url')
+            if base_url:
+                return f"{base_url.rstrip('/')}{obj.logo.url}"
         return None
 
 
@@ -0,0 +1,163 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from accounts.models import User
+from .models import Business, BusinessCategory, BusinessHours, BusinessSnapshot, BusinessTimePeriod, Service
+from . import search
+from .autocomplete import autocomplete_index
+from .listings import invalidate_listings
+from appointment_system.cache import analytics_cache, availability_cache, categories_cache
+
+
+@receiver(post_save, sender=Business)
+def index_business(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_businesses([instance.pk])
+
+
+@receiver(post_delete, sender=Business)
+def unindex_business(sender, instance, **kwargs):
+    search.remove_businesses([instance.pk])
+
+
+@receiver(post_delete, sender=Business)
+def decrement_category_business_count(sender, instance, **kwargs):
+    counted = getattr(instance, '_loaded_counted_category', instance.counted_category())
+    if counted:
+        BusinessCategory.adjust_business_count(counted, -1)
+
+
+@receiver(post_save, sender=BusinessCategory)
+def reindex_category_businesses(sender, instance, created=False, raw=False, **kwargs):
+    if created or raw:
+        return
+    search.index_businesses(instance.businesses.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=BusinessCategory)
+def remember_category_businesses(sender, instance, **kwargs):
+    # The FK is SET_NULL through a bulk update, so no Business post_save fires
+    instance._search_business_ids = list(instance.businesses.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=BusinessCategory)
+def reindex_uncategorized_businesses(sender, instance, **kwargs):
+    search.index_businesses(getattr(instance, '_search_business_ids', []))
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def sync_business_autocomplete(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete_index.sync_business(instance, deleted=kwargs['signal'] is post_delete)
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def sync_service_autocomplete(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete_index.sync_service(instance, deleted=kwargs['signal'] is post_delete)
+
+
+@receiver(post_save, sender=BusinessCategory)
+@receiver(post_delete, sender=BusinessCategory)
+def sync_category_autocomplete(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete_index.sync_category(instance, deleted=kwargs['signal'] is post_delete)
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+@receiver(post_save, sender=BusinessCategory)
+@receiver(post_delete, sender=BusinessCategory)
+@receiver(post_save, sender=BusinessHours)
+@receiver(post_delete, sender=BusinessHours)
+@receiver(post_save, sender=BusinessTimePeriod)
+@receiver(post_delete, sender=BusinessTimePeriod)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_business_listings(sender, instance, **kwargs):
+    invalidate_listings()
+
+
+@receiver(post_save, sender=User)
+def invalidate_owner_listings(sender, instance, **kwargs):
+    # Listings embed owner_details, so business owner profile edits count too
+    if instance.user_type == 'business':
+        invalidate_listings()
+
+
+@receiver(post_save, sender=Business)
+def mark_business_snapshot_stale(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        BusinessSnapshot.objects.create(business=instance)
+    else:
+        BusinessSnapshot.mark_stale(business=instance)
+
+
+@receiver(post_save, sender=BusinessHours)
+@receiver(post_delete, sender=BusinessHours)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def mark_related_snapshot_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    BusinessSnapshot.mark_stale(business_id=instance.business_id)
+
+
+@receiver(post_save, sender=BusinessTimePeriod)
+@receiver(post_delete, sender=BusinessTimePeriod)
+def mark_period_snapshot_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    BusinessSnapshot.mark_stale(business__business_hours=instance.business_hours_id)
+
+
+@receiver(post_save, sender=BusinessCategory)
+def mark_category_snapshots_stale(sender, instance, created=False, raw=False, **kwargs):
+    if created or raw:
+        return
+    BusinessSnapshot.mark_stale(business__category=instance)
+
+
+@receiver(post_save, sender=User)
+def mark_owner_snapshots_stale(sender, instance, **kwargs):
+    if instance.user_type == 'business':
+        BusinessSnapshot.mark_stale(business__owner=instance)
+
+
+@receiver(post_save, sender=BusinessCategory)
+@receiver(post_delete, sender=BusinessCategory)
+def invalidate_cached_categories(sender, instance, **kwargs):
+    categories_cache.invalidate_on_commit()
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+@receiver(post_save, sender=BusinessHours)
+@receiver(post_delete, sender=BusinessHours)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_business_availability(sender, instance, **kwargs):
+    business_id = instance.pk if sender is Business else instance.business_id
+    availability_cache.invalidate_on_commit(scope=business_id)
+
+
+@receiver(post_save, sender=BusinessTimePeriod)
+@receiver(post_delete, sender=BusinessTimePeriod)
+def invalidate_period_availability(sender, instance, **kwargs):
+    business_id = BusinessHours.objects.filter(pk=instance.business_hours_id).values_list('business_id', flat=True).first()
+    if business_id:
+        availability_cache.invalidate_on_commit(scope=business_id)
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def invalidate_business_analytics(sender, instance, created=False, **kwargs):
+    if created or kwargs['signal'] is post_delete:
+        analytics_cache.invalidate_on_commit()
@@ -0,0 +1,107 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from .models import Business, BusinessHours, BusinessSnapshot
+from .serializers import BusinessSerializer
+from appointment_system.cache import snapshots_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_BATCH_SIZE = 200
+
+
+def snapshot_queryset():
+    return Business.objects.select_related('owner', 'category').prefetch_related(
+        Prefetch('business_hours', queryset=BusinessHours.objects.prefetch_related('time_periods_set')),
+        'services')
+
+
+def render_business(business):
+    serializer = BusinessSerializer(business, context={'base_url': settings.BACKEND_URL})
+    return JSONRenderer().render(serializer.data).decode('utf-8')
+
+
+def regenerate_snapshots(business_ids):
+    business_ids = list(business_ids)
+    if not business_ids:
+        return {}, {}
+    BusinessSnapshot.objects.bulk_create(
+        [BusinessSnapshot(business_id=business_id) for business_id in business_ids], ignore_conflicts=True)
+    # Versions are read before the business data: a write that lands while we
+    # render bumps the version and our stale payload is not stored
+    versions = dict(BusinessSnapshot.objects.filter(business_id__in=business_ids).values_list('business_id', 'version'))
+    businesses = snapshot_queryset().in_bulk(business_ids)
+    payloads = {}
+    stored = {}
+    now = timezone.now()
+    for business_id, business in businesses.items():
+        payloads[business_id] = render_business(business)
+        if BusinessSnapshot.objects.filter(business_id=business_id, version=versions.get(business_id, 0)).update(
+                payload=payloads[business_id], is_stale=False, updated_at=now):
+            stored[business_id] = payloads[business_id]
+    return payloads, stored
+
+
+def regenerate_or_render(business_ids):
+    # A failed regeneration must not shorten a page whose count includes these
+    # rows: render them without storing, as the serializer would
+    if not business_ids:
+        return {}, {}
+    try:
+        return regenerate_snapshots(business_ids)
+    except Exception as e:
+        logger.error(f"Failed to regenerate snapshots for {len(business_ids)} businesses: {str(e)}")
+        return {business_id: render_business(business) for business_id, business in snapshot_queryset().in_bulk(business_ids).items()}, {}
+
+
+def get_snapshot_payloads(business_ids):
+    # Returns {id: json} for every requested business: cache tiers first, then
+    # fresh database rows, regenerating missing or stale ones last
+    cache_versions = snapshots_cache.current_scoped_versions(business_ids)
+    payloads = snapshots_cache.get_scoped_many('payload', business_ids, versions=cache_versions)
+    missing = [business_id for business_id in business_ids if business_id not in payloads]
+    if not missing:
+        return payloads
+    fresh = dict(BusinessSnapshot.objects.filter(
+        business_id__in=missing, is_stale=False).values_list('business_id', 'payload'))
+    stale = [business_id for business_id in missing if business_id not in fresh]
+    regenerated, stored = regenerate_or_render(stale)
+    if fresh or stored:
+        snapshots_cache.set_scoped_many('payload', {**fresh, **stored}, versions=cache_versions)
+    payloads.update(fresh)
+    payloads.update(regenerated)
+    return payloads
+
+
+async def aget_snapshot_payloads(business_ids):
+    # get_snapshot_payloads for the ASGI views; only regeneration (serializers) runs in a thread
+    cache_versions = await snapshots_cache.acurrent_scoped_versions(business_ids)
+    payloads = await snapshots_cache.aget_scoped_many('payload', business_ids, versions=cache_versions)
+    missing = [business_id for business_id in business_ids if business_id not in payloads]
+    if not missing:
+        return payloads
+    fresh = {
+        business_id: payload async for business_id, payload in BusinessSnapshot.objects.filter(
+            business_id__in=missing, is_stale=False).values_list('business_id', 'payload')}
+    stale = [business_id for business_id in missing if business_id not in fresh]
+    regenerated, stored = await sync_to_async(regenerate_or_render)(stale)
+    if fresh or stored:
+        await snapshots_cache.aset_scoped_many('payload', {**fresh, **stored}, versions=cache_versions)
+    payloads.update(fresh)
+    payloads.update(regenerated)
+    return payloads
+
+
+def rebuild_snapshots(batch_size=SNAPSHOT_BATCH_SIZE, only_stale=False):
+    business_ids = Business.objects.order_by('id').values_list('id', flat=True)
+    if only_stale:
+        business_ids = business_ids.exclude(snapshot__is_stale=False)
+    business_ids = list(business_ids)
+    for start in range(0, len(business_ids), batch_size):
+        regenerate_snapshots(business_ids[start:start + batch_size])
+    snapshots_cache.invalidate()
+    logger.info(f"Rendered {len(business_ids)} business snapshots")
+    return len(business_ids)
@@ -0,0 +1,55 @@
+from django.db.models import Count, Q
+from .geo import encode_geohash, geocode_address
+from .models import Business, BusinessCategory, BusinessSnapshot
+import logging
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_BATCH_SIZE = 500
+
+
+def save_coordinates(businesses):
+    Business.objects.bulk_update(businesses, ['latitude', 'longitude', 'geohash'])
+    BusinessSnapshot.mark_stale(business__in=[business.id for business in businesses])
+    return len(businesses)
+
+
+def geocode_businesses(only_missing=True, batch_size=GEOCODE_BATCH_SIZE):
+    businesses = Business.objects.exclude(address__isnull=True).exclude(address='')
+    if only_missing:
+        businesses = businesses.filter(latitude__isnull=True)
+    located = 0
+    unresolved = 0
+    pending = []
+    for business in businesses.only('id', 'address').iterator(chunk_size=batch_size):
+        coordinates = geocode_address(business.address)
+        if not coordinates:
+            unresolved += 1
+            continue
+        business.latitude, business.longitude = coordinates
+        business.geohash = encode_geohash(*coordinates)
+        pending.append(business)
+        if len(pending) >= batch_size:
+            located += save_coordinates(pending)
+            pending = []
+    if pending:
+        located += save_coordinates(pending)
+    logger.info(f"Geocoded {located} businesses, {unresolved} addresses not in the gazetteer")
+    return {'located': located, 'unresolved': unresolved}
+
+
+def reconcile_category_counts():
+    # Repairs business_count after writes that bypass Business.save (queryset.update, raw SQL)
+    categories = BusinessCategory.objects.annotate(
+        actual_count=Count('businesses', filter=Q(businesses__is_active=True)))
+    drifted = []
+    for category in categories:
+        if category.business_count != category.actual_count:
+            logger.warning(
+                f"Category {category.id} business_count {category.business_count} != {category.actual_count}")
+            category.business_count = category.actual_count
+            drifted.append(category)
+    BusinessCategory.objects.bulk_update(drifted, ['business_count'])
+    if drifted:
+        BusinessSnapshot.mark_stale(business__category__in=drifted)
+    return {'checked': len(categories), 'fixed': len(drifted)}
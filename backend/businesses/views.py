@@ -8,14 +8,29 @@ from .serializers import (
     CategoryRequestSerializer, BusinessTimePeriodSerializer)
 from appointments.models import Appointment
 from appointments.serializers import AppointmentSerializer
+from appointment_system.cache import categories_cache
+from appointment_system.conditional import ConditionalGetMixin
+from .search import search_businesses
+from .autocomplete import autocomplete_index, AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT
+from .snapshots import get_snapshot_payloads, snapshot_queryset
+from .listings import build_by_category, build_featured, cached_listing
+from .facets import compute_facets, filter_by_bands
+from .geo import GEOHASH_RANGE_END, cell_coverage_km, haversine_km, neighborhood_cells, precision_for_radius
 from django.db.models import Q
 from django.db import transaction
 from django.core.mail import send_mail
 from django.conf import settings
+from django.http import HttpResponse
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+NEAR_DEFAULT_LIMIT = 20
+NEAR_MAX_LIMIT = 100
+NEAR_MAX_RADIUS_KM = 100
+NEAR_START_RADIUS_KM = 2
+
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -31,10 +46,23 @@ class IsAdminOrBusinessOwner(permissions.BasePermission):
             request.user.user_type == 'admin')
 
 
-class BusinessCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class BusinessCategoryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = BusinessCategory.objects.filter(is_active=True).order_by('sort_order', 'name')
     serializer_class = BusinessCategorySerializer
     permission_classes = [permissions.AllowAny]
+
+    def list(self, request, *args, **kwargs):
+        # Pagination links are absolute, so the full URI is the key
+        data = categories_cache.get_or_set(
+            f"list:{request.accepted_renderer.format}:{request.build_absolute_uri()}",
+            lambda: super(BusinessCategoryViewSet, self).list(request, *args, **kwargs).data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = categories_cache.get_or_set(
+            f"detail:{kwargs.get('pk')}",
+            lambda: super(BusinessCategoryViewSet, self).retrieve(request, *args, **kwargs).data)
+        return Response(data)
     
     @action(detail=True, methods=['get'])
     def businesses(self, request, pk=None):
@@ -51,8 +79,11 @@ class BusinessCategoryViewSet(viewsets.ReadOnlyModelViewSet):
             'businesses': serializer.data})
 
 
-class BusinessViewSet(viewsets.ModelViewSet):
+class BusinessViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = BusinessSerializer
+    # Snapshot timestamps move whenever hours, services, category or owner change
+    conditional_timestamp_fields = ('updated_at', 'snapshot__updated_at')
+
     def get_queryset(self):
         user = self.request.user
         queryset = Business.objects.filter(is_active=True)
@@ -64,11 +95,18 @@ class BusinessViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(category__slug=category)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(address__icontains=search) |
-                Q(category__name__icontains=search))
+            ranked = search_businesses(queryset, search)
+            if ranked is None:
+                queryset = queryset.filter(
+                    Q(name__icontains=search) |
+                    Q(description__icontains=search) |
+                    Q(address__icontains=search) |
+                    Q(category__name__icontains=search))
+            else:
+                queryset = ranked
+        if not queryset.ordered:
+            # Stable pages for the paginator (ranked searches are already ordered)
+            queryset = queryset.order_by('id')
         if not user.is_authenticated:
             return queryset
         if user.user_type == 'admin':
@@ -95,6 +133,48 @@ class BusinessViewSet(viewsets.ModelViewSet):
         return BusinessSerializer
     
 
+    def serves_snapshots(self, request):
+        # Snapshots hold rendered JSON, so other formats (browsable API) serialize as before
+        return request.accepted_renderer.format == 'json'
+
+
+    def snapshot_list_response(self, queryset, extra=None):
+        # One page of stored snapshot JSON, in the paginator's envelope; extra
+        # keys (already JSON-serializable) are appended to it
+        business_ids = queryset.values_list('id', flat=True)
+        page = self.paginate_queryset(business_ids)
+        business_ids = list(page if page is not None else business_ids)
+        payloads = get_snapshot_payloads(business_ids)
+        results = '[' + ','.join(payloads[business_id] for business_id in business_ids if business_id in payloads) + ']'
+        extra_fields = ''.join(f',{json.dumps(key)}:{json.dumps(value)}' for key, value in (extra or {}).items())
+        if page is None:
+            if not extra_fields:
+                return HttpResponse(results, content_type='application/json')
+            return HttpResponse(f'{{"results":{results}{extra_fields}}}', content_type='application/json')
+        body = (
+            f'{{"count":{self.paginator.page.paginator.count},'
+            f'"next":{json.dumps(self.paginator.get_next_link())},'
+            f'"previous":{json.dumps(self.paginator.get_previous_link())},'
+            f'"results":{results}{extra_fields}}}')
+        return HttpResponse(body, content_type='application/json')
+
+
+    def list(self, request, *args, **kwargs):
+        if not self.serves_snapshots(request):
+            return super().list(request, *args, **kwargs)
+        return self.snapshot_list_response(self.filter_queryset(self.get_queryset()))
+
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.serves_snapshots(request):
+            return super().retrieve(request, *args, **kwargs)
+        business = self.get_object()
+        payload = get_snapshot_payloads([business.id]).get(business.id)
+        if payload is None:
+            return super().retrieve(request, *args, **kwargs)
+        return HttpResponse(payload, content_type='application/json')
+    
+
     def perform_create(self, serializer):
         logger.info(f"Creating business with user: {self.request.user} (ID: {self.request.user.id})")
         business = serializer.save(owner=self.request.user)
@@ -113,28 +193,101 @@ class BusinessViewSet(viewsets.ModelViewSet):
         logger.info(f"Returning business data: {response_serializer.data}")
         return Response(response_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
     
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        types = request.query_params.get('types')
+        kinds = set(types.split(',')) if types else None
+        results = autocomplete_index.lookup(query, limit=max(limit, 1), kinds=kinds)
+        return Response({'query': query, 'results': results})
+
+    @action(detail=False, methods=['get'])
+    def faceted(self, request):
+        queryset = filter_by_bands(
+            self.get_queryset(),
+            price_band=request.query_params.get('price_band'),
+            duration_band=request.query_params.get('duration_band'))
+        facets = compute_facets(queryset)
+        if self.serves_snapshots(request):
+            return self.snapshot_list_response(queryset, extra={'facets': facets})
+        business_ids = queryset.values_list('id', flat=True)
+        page = self.paginate_queryset(business_ids)
+        business_ids = list(page if page is not None else business_ids)
+        # Same related rows the snapshots prefetch, kept in page order
+        businesses = snapshot_queryset().in_bulk(business_ids)
+        data = self.get_serializer([businesses[business_id] for business_id in business_ids], many=True).data
+        if page is not None:
+            response = self.get_paginated_response(data)
+            response.data['facets'] = facets
+            return response
+        return Response({'results': data, 'facets': facets})
+
+    def nearby_candidates(self, queryset, latitude, longitude, precision):
+        cells = Q()
+        for cell in neighborhood_cells(latitude, longitude, precision):
+            cells |= Q(geohash__gte=cell, geohash__lt=cell + GEOHASH_RANGE_END)
+        candidates = queryset.filter(cells).values_list('id', 'latitude', 'longitude')
+        return [(haversine_km(latitude, longitude, lat, lng), business_id) for business_id, lat, lng in candidates]
+
+    @action(detail=False, methods=['get'])
+    def near(self, request):
+        try:
+            latitude = float(request.query_params['lat'])
+            longitude = float(request.query_params['lng'])
+            radius = request.query_params.get('radius')
+            radius = float(radius) if radius else None
+            limit = min(int(request.query_params.get('limit', NEAR_DEFAULT_LIMIT)), NEAR_MAX_LIMIT)
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'lat and lng are required; radius (km) and limit must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or limit < 1 or (radius is not None and radius <= 0):
+            return Response({'error': 'Coordinates, radius or limit out of range'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.get_queryset().filter(geohash__isnull=False)
+        if radius is not None:
+            # Radius query: one 3x3 block of cells just large enough to cover the circle
+            radius = min(radius, NEAR_MAX_RADIUS_KM)
+            precision = precision_for_radius(radius, latitude)
+            nearest = sorted(
+                match for match in self.nearby_candidates(queryset, latitude, longitude, precision)
+                if match[0] <= radius)[:limit]
+        else:
+            # Nearest-K: widen the block until K businesses fall inside its guaranteed radius
+            precision = precision_for_radius(NEAR_START_RADIUS_KM, latitude)
+            while True:
+                candidates = sorted(self.nearby_candidates(queryset, latitude, longitude, precision))
+                covered = cell_coverage_km(precision, latitude)
+                if precision == 1 or sum(1 for distance, business_id in candidates if distance <= covered) >= limit:
+                    break
+                precision -= 1
+            nearest = candidates[:limit]
+        if self.serves_snapshots(request):
+            # Stored snapshot JSON with distance_km spliced in as the first key
+            payloads = get_snapshot_payloads([business_id for distance, business_id in nearest])
+            results = [
+                f'{{"distance_km":{round(distance, 3)},{payloads[business_id][1:]}'
+                for distance, business_id in nearest if business_id in payloads]
+            return HttpResponse(
+                f'{{"count":{len(results)},"results":[{",".join(results)}]}}', content_type='application/json')
+        businesses = snapshot_queryset().in_bulk([business_id for distance, business_id in nearest])
+        results = []
+        for distance, business_id in nearest:
+            data = BusinessSerializer(businesses[business_id], context={'request': request}).data
+            data['distance_km'] = round(distance, 3)
+            results.append(data)
+        return Response({'count': len(results), 'results': results})
+
     @action(detail=False, methods=['get'])
     def by_category(self, request):
-        categories = BusinessCategory.objects.filter(is_active=True).order_by('sort_order', 'name')
-        result = []
-        for category in categories:
-            businesses = category.businesses.filter(is_active=True)[:6]  # Limit to 6 per category
-            if businesses.exists():
-                result.append({
-                    'category': BusinessCategorySerializer(category).data,
-                    'businesses': BusinessSerializer(businesses, many=True, context={'request': request}).data})
-        return Response(result)
+        return Response(cached_listing('by_category', request, build_by_category))
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
-        categories = BusinessCategory.objects.filter(is_active=True).order_by('sort_order', 'name')[:8]
-        featured_businesses = []
-        for category in categories:
-            business = category.businesses.filter(is_active=True).first()
-            if business:
-                featured_businesses.append(business)
-        serializer = BusinessSerializer(featured_businesses, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response(cached_listing('featured', request, build_featured))
 
 
     @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -338,7 +491,7 @@ class BusinessHoursViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST)
 
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
     
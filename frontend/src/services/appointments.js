@@ -6,6 +6,38 @@ const APPOINTMENT_ENDPOINTS = {
   AVAILABLE_SLOTS: '/api/appointments/available-slots/',
   MY_APPOINTMENTS: '/api/appointments/my_appointments/',
   CANCEL_APPOINTMENT: (appointmentId) => `/api/appointments/${appointmentId}/cancel/`,
+  SLOT_EVENTS: '/api/appointments/events/',
+};
+
+const toMinutes = (time) => {
+  const [hours, minutes] = time.split(':').map(Number);
+  return hours * 60 + minutes;
+};
+
+const toTime = (minutes) => {
+  const pad = (value) => String(value).padStart(2, '0');
+  return `${pad(Math.floor(minutes / 60) % 24)}:${pad(minutes % 60)}`;
+};
+
+// Expands the encoding=bitmap response into { 'YYYY-MM-DD': [{ start_time, end_time, period_name }] }
+export const decodeAvailabilityBitmap = ({ granularity, duration, days }) => {
+  const slotsByDate = {};
+  days.forEach(({ date, periods, bitmap }) => {
+    const bytes = atob(bitmap);
+    const slots = [];
+    let bit = 0;
+    periods.forEach(([start, , name, steps]) => {
+      const periodStart = toMinutes(start);
+      for (let step = 0; step < steps; step += 1, bit += 1) {
+        if (bytes.charCodeAt(bit >> 3) & (0x80 >> (bit & 7))) {
+          const slotStart = periodStart + step * granularity;
+          slots.push({ start_time: toTime(slotStart), end_time: toTime(slotStart + duration), period_name: name });
+        }
+      }
+    });
+    slotsByDate[date] = slots;
+  });
+  return slotsByDate;
 };
 
 const appointmentService = {
@@ -44,6 +76,21 @@ const appointmentService = {
     console.log('Available slots API response:', response.data);
     return response.data;
   },
+  getAvailableTimeSlotsRange: async (businessId, serviceId, startDate, days) => {
+    const response = await apiClient.get(APPOINTMENT_ENDPOINTS.AVAILABLE_SLOTS, {
+      params: { business_id: businessId, service_id: serviceId, date: startDate, days, encoding: 'bitmap' },
+    });
+    return decodeAvailabilityBitmap(response.data);
+  },
+  // Live slot_taken / slot_freed events for one business and date; returns an unsubscribe function
+  subscribeToSlotEvents: (businessId, date, onEvent) => {
+    const params = new URLSearchParams({ business_id: businessId, date });
+    const source = new EventSource(`${apiClient.defaults.baseURL}${APPOINTMENT_ENDPOINTS.SLOT_EVENTS}?${params}`);
+    const handle = (message) => onEvent(JSON.parse(message.data));
+    source.addEventListener('slot_taken', handle);
+    source.addEventListener('slot_freed', handle);
+    return () => source.close();
+  },
 };
 
 export default appointmentService;
\ No newline at end of file